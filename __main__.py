@@ -0,0 +1,41 @@
+""" Entry point: python <directory of the scripts> [command] [options]. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import importlib
+import sys
+
+
+# Modules with main(argv) by command; only the chosen one is imported,
+# so headless commands never load Pygame.
+COMMANDS = {'gui': 'a_star_visualization',
+            'batch': 'a_star_batch',
+            'benchmark': 'a_star_benchmark'}
+
+
+def main(argv=None):
+    """ Run main() of the command module with the rest of arguments. """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        if argv and argv[0] in ('-h', '--help'):
+            print('usage: python {} [{}] [options]'.format(
+                  sys.argv[0], '|'.join(COMMANDS)))
+            print('Commands: gui (default), batch, benchmark; '
+                  'use "<command> -h" for their options.')
+            return 0
+        argv = ['gui'] + argv
+    module = importlib.import_module(COMMANDS[argv[0]])
+    return module.main(argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+""" Batch A* path search from the command line, without GUI. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import argparse
+import math
+import sys
+import time
+from multiprocessing import Pool, shared_memory
+import numpy as np
+
+from a_star_engine import Astar
+from a_star_maps import load_map
+from a_star_kernel import BACKENDS
+from a_star_jps import JumpPointSearch
+from a_star_incremental import IncrementalAstar
+from a_star_hpa import HierarchicalAstar
+from a_star_bidirectional import BidirectionalAstar
+from a_star_multigoal import MultiGoalAstar
+
+
+MODES = {'astar': Astar,
+         'jps': JumpPointSearch,
+         'incremental': IncrementalAstar,
+         'hpa': HierarchicalAstar,
+         'bidirectional': BidirectionalAstar,
+         'multigoal': MultiGoalAstar}
+
+
+# Per-process state of pool workers, set by init_worker().
+worker_memory = None    # shared memory block with grid cells
+worker_solver = None    # solver over the shared cells
+
+
+def read_queries(lines):
+    """
+    Return list of (start, end) pairs from lines 'row1 col1 row2 col2'.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    queries = []
+    for line in lines:
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        row1, col1, row2, col2 = (int(field) for field in fields[:4])
+        queries.append(((row1, col1), (row2, col2)))
+    return queries
+
+
+def format_path(path):
+    """ Return path as one line of 'row,col' cells (empty if no path). """
+    return ' '.join('{},{}'.format(row, col) for row, col in path)
+
+
+def solve_by_start(solver, queries):
+    """
+    Return list of paths for (start, end) queries in the same order,
+    found by one search_all() of the solver for all ends of each start.
+    """
+    ends_of = {}
+    for start, end in queries:
+        ends_of.setdefault(tuple(start), []).append(tuple(end))
+    found = {}
+    for start, ends in ends_of.items():
+        for end, path in zip(ends, solver.search_all(start, ends)):
+            found[start, end] = path
+    return [found[tuple(start), tuple(end)] for start, end in queries]
+
+
+def solve_queries(grid, queries, mode='astar', stats=None, **options):
+    """
+    Return list of paths for (start, end) queries in the same order.
+    One solver of the class MODES[mode] is reused for all queries;
+    grid cells stay unchanged. Solvers with search_all() (multigoal)
+    find paths to all ends of the same start in one search.
+    Options are passed to the solver: diagonal_cost, heuristic, weight,
+    cache_size, components, backend. The stats dict, if given, gets the path
+    cache counters.
+    """
+    solver = MODES[mode](grid.width, grid.height, cells=grid.cells,
+                         mark_cells=False, **options)
+    if hasattr(solver, 'search_all'):
+        paths = solve_by_start(solver, queries)
+    else:
+        paths = [solver.a_star_search(start, end)
+                 for start, end in queries]
+    if stats is not None and solver.path_cache is not None:
+        stats.update(solver.path_cache.stats())
+    return paths
+
+
+def init_worker(memory_name, width, height, mode, options):
+    """ Attach worker process to grid cells in shared memory. """
+    global worker_memory, worker_solver
+    worker_memory = shared_memory.SharedMemory(name=memory_name)
+    cells = np.ndarray((height, width), dtype=np.uint8,
+                       buffer=worker_memory.buf)
+    worker_solver = MODES[mode](width, height, cells=cells,
+                                mark_cells=False, **options)
+
+
+def solve_chunk(queries):
+    """ Return list of paths for queries solved by the worker's solver. """
+    if hasattr(worker_solver, 'search_all'):
+        return solve_by_start(worker_solver, queries)
+    return [worker_solver.a_star_search(start, end)
+            for start, end in queries]
+
+
+def solve_parallel(grid, queries, workers=None, chunk_size=64,
+                   mode='astar', **options):
+    """
+    Return list of paths for (start, end) queries in the same order,
+    solved by a pool of worker processes (os.cpu_count() by default).
+    Grid cells are copied once into shared memory and read by all
+    workers; each worker keeps only its own search state.
+    """
+    memory = shared_memory.SharedMemory(create=True,
+                                        size=max(grid.cells.nbytes, 1))
+    try:
+        cells = np.ndarray(grid.cells.shape, dtype=np.uint8,
+                           buffer=memory.buf)
+        cells[:] = grid.cells
+        chunks = [queries[i:i + chunk_size]
+                  for i in range(0, len(queries), chunk_size)]
+        paths = []
+        with Pool(workers, initializer=init_worker,
+                  initargs=(memory.name, grid.width, grid.height, mode,
+                            options)) as pool:
+            # imap yields results in order of chunks.
+            for chunk_paths in pool.imap(solve_chunk, chunks):
+                paths.extend(chunk_paths)
+        del cells
+    finally:
+        memory.close()
+        memory.unlink()
+    return paths
+
+
+def parse_args(argv):
+    """ Return parsed command line arguments. """
+    parser = argparse.ArgumentParser(
+        description='Find A* paths for many start/end queries on one map.')
+    parser.add_argument('map', help='text map (obstacles are any of "@OTW#"),'
+                                    ' image or binary map')
+    parser.add_argument('queries',
+                        help='file with lines "row1 col1 row2 col2"')
+    parser.add_argument('-o', '--output', default='-',
+                        help='file for paths, one line per query '
+                             '(default: stdout)')
+    parser.add_argument('--mode', choices=sorted(MODES), default='astar')
+    parser.add_argument('--heuristic')
+    parser.add_argument('--weight', type=float)
+    # One default for all modes (their classes differ: Astar has 1),
+    # so that costs of paths do not depend on the mode.
+    parser.add_argument('--diagonal-cost', type=float, default=math.sqrt(2),
+                        help='cost of diagonal moves (default: sqrt(2))')
+    parser.add_argument('--cache-size', type=int,
+                        help='number of paths kept for repeated queries')
+    parser.add_argument('--components', action='store_true',
+                        help='reject queries between disconnected cells '
+                             'without search')
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help='numba runs A* in compiled code if installed')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='number of worker processes '
+                             '(0: one per CPU, default: 1)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """ Run batch search and report queries per second to stderr. """
+    args = parse_args(argv)
+    grid = load_map(args.map, mmap_mode='r')
+    with open(args.queries) as queries_file:
+        queries = read_queries(queries_file)
+
+    # Options not given on the command line keep defaults of the mode,
+    # except diagonal_cost.
+    options = {name: value for name, value in
+               (('heuristic', args.heuristic), ('weight', args.weight),
+                ('diagonal_cost', args.diagonal_cost),
+                ('cache_size', args.cache_size),
+                ('components', args.components or None),
+                ('backend', args.backend))
+               if value is not None}
+    start_time = time.perf_counter()
+    stats = {}
+    if args.workers == 1:
+        paths = solve_queries(grid, queries, args.mode, stats, **options)
+    else:
+        paths = solve_parallel(grid, queries, args.workers or None,
+                               mode=args.mode, **options)
+    elapsed = time.perf_counter() - start_time
+
+    lines = ''.join(format_path(path) + '\n' for path in paths)
+    if args.output == '-':
+        sys.stdout.write(lines)
+    else:
+        with open(args.output, 'w') as output_file:
+            output_file.write(lines)
+
+    found = sum(1 for path in paths if path)
+    rate = len(queries) / elapsed if elapsed else float('inf')
+    print('{} queries ({} found) in {:.3f}s: {:.1f} queries/s'.format(
+          len(queries), found, elapsed, rate), file=sys.stderr)
+    if stats:
+        print('cache: {hits} hits, {subpath_hits} subpath hits, '
+              '{misses} misses'.format(**stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,544 @@
+""" Benchmarks of path search modes from 'a_star_batch.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from a_star_engine import Astar, Grid, EMPTY, FULL, grid_from_text
+from a_star_incremental import IncrementalAstar
+from a_star_batch import MODES, solve_parallel
+from a_star_kernel import BACKENDS
+from a_star_queues import QUEUES
+
+
+# All modes are compared with octile costs, the only ones JPS supports.
+SEARCH_OPTIONS = {'diagonal_cost': math.sqrt(2), 'heuristic': 'octile'}
+
+
+# Every map generator takes the size of a square map and a seed and
+# returns a Grid; the same seed always gives the same map.
+
+def random_map(size, seed, density=0.2):
+    """ Map with obstacles placed at random with the density. """
+    grid = Grid(size, size)
+    rng = np.random.default_rng(seed)
+    grid.cells[rng.random((size, size)) < density] = FULL
+    return grid
+
+
+def maze_map(size, seed):
+    """
+    Perfect maze of corridors one cell wide (recursive backtracker):
+    free cells at odd (row, col) connected through walls between them.
+    """
+    grid = Grid(size, size)
+    grid.cells[:] = FULL
+    rng = random.Random(seed)
+    last = size - 2     # cells of the maze are at 1, 3, ..., last
+    if last < 1:
+        return grid
+    grid.cells[1, 1] = EMPTY
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        moves = [(d_row, d_col) for d_row, d_col in
+                 ((-2, 0), (2, 0), (0, -2), (0, 2))
+                 if 1 <= row + d_row <= last and 1 <= col + d_col <= last
+                 and grid.cells[row + d_row, col + d_col] == FULL]
+        if not moves:
+            stack.pop()
+            continue
+        d_row, d_col = rng.choice(moves)
+        grid.cells[row + d_row // 2, col + d_col // 2] = EMPTY
+        grid.cells[row + d_row, col + d_col] = EMPTY
+        stack.append((row + d_row, col + d_col))
+    return grid
+
+
+def room_map(size, seed, room=16, door=3):
+    """
+    Square rooms with side room separated by walls one cell thick;
+    every wall between two rooms has a door of width door at random.
+    """
+    grid = Grid(size, size)
+    rng = random.Random(seed)
+    grid.cells[::room, :] = FULL
+    grid.cells[:, ::room] = FULL
+    for row0 in range(0, size, room):
+        for col0 in range(0, size, room):
+            # Door down from the room and door to the right of it.
+            length = min(room - 1, size - col0 - 1)
+            if row0 + room < size and length > 0:
+                pos = col0 + 1 + rng.randrange(max(length - door + 1, 1))
+                grid.cells[row0 + room, pos:pos + door] = EMPTY
+            length = min(room - 1, size - row0 - 1)
+            if col0 + room < size and length > 0:
+                pos = row0 + 1 + rng.randrange(max(length - door + 1, 1))
+                grid.cells[pos:pos + door, col0 + room] = EMPTY
+    return grid
+
+
+def open_map(size, seed):
+    """ Map without obstacles. """
+    return Grid(size, size)
+
+
+MAPS = {'random': random_map,
+        'maze': maze_map,
+        'room': room_map,
+        'open': open_map}
+
+
+def random_queries(grid, count, seed, radius=None):
+    """
+    Return list of count (start, end) pairs of random free cells.
+    With radius every end is at most radius rows and columns away
+    from its start (short queries).
+    """
+    rng = random.Random(seed)
+    free = np.flatnonzero(grid.cells.reshape(-1) != FULL)
+    if not len(free):
+        return []
+    queries = []
+    for _ in range(count):
+        start, end = (grid.to_cell(int(free[rng.randrange(len(free))]))
+                      for _ in range(2))
+        if radius is not None:
+            row0, col0 = (max(pos - radius, 0) for pos in start)
+            window = grid.cells[row0:start[0] + radius + 1,
+                                col0:start[1] + radius + 1]
+            near = np.flatnonzero(window.reshape(-1) != FULL)
+            row, col = divmod(int(near[rng.randrange(len(near))]),
+                              window.shape[1])
+            end = (row0 + row, col0 + col)
+        queries.append((start, end))
+    return queries
+
+
+def read_scenario(lines):
+    """
+    Return list of (start, end, optimal length) from lines of a Moving
+    AI '.scen' file: 'bucket map width height x1 y1 x2 y2 length'
+    (x is a column, y is a row). The 'version' line is skipped.
+    """
+    queries = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 9 or fields[0] == 'version':
+            continue
+        col1, row1, col2, row2 = (int(field) for field in fields[4:8])
+        queries.append(((row1, col1), (row2, col2), float(fields[8])))
+    return queries
+
+
+def path_cost(path, diagonal_cost=math.sqrt(2)):
+    """ Return cost of the path of (row, col) cells. """
+    cost = 0
+    for (row1, col1), (row2, col2) in zip(path, path[1:]):
+        cost += diagonal_cost if row1 != row2 and col1 != col2 else 1
+    return cost
+
+
+def expansions(solver):
+    """ Return number of cells expanded by the last search of solver. """
+    if solver.use_kernel():
+        return solver.kernel.expansions
+    if hasattr(solver, 'expansions'):
+        return solver.expansions
+    return len(solver.closed)
+
+
+def run_mode(grid, queries, mode, optimal, memory=True, marks=False,
+             backend='python', queue='lazy', lengths=None):
+    """
+    Solve queries with a solver of the mode on the grid and return
+    list of per query dicts: time (ms), expansions, found, cost,
+    ratio of cost to the optimal one, difference of cost from the
+    scenario length (if lengths are given) and peak memory (KiB)
+    of the search.
+    Peak memory is measured in a second pass (tracemalloc slows down
+    the search) unless memory is False.
+    With marks the solver marks SEARCH and PATH cells on a copy of
+    the grid and clears them after every query, as the GUI does.
+    Backend and queue are passed to the solver (see a_star_kernel and
+    a_star_queues).
+    """
+    cells = grid.cells.copy() if marks else grid.cells
+    solver = MODES[mode](grid.width, grid.height, cells=cells,
+                         mark_cells=marks, backend=backend, queue=queue,
+                         **SEARCH_OPTIONS)
+    if lengths is None:
+        lengths = [None] * len(queries)
+    records = []
+    for (start, end), best, length in zip(queries, optimal, lengths):
+        start_time = time.perf_counter()
+        path = solver.a_star_search(start, end)
+        if marks:
+            solver.clear_marks()
+        elapsed = time.perf_counter() - start_time
+        cost = path_cost(path) if path else None
+        if cost is None or best is None:
+            ratio = None
+        else:
+            ratio = cost / best if best else 1.0
+        if cost is None or length is None:
+            scenario_diff = None
+        else:
+            scenario_diff = cost - length
+        records.append({'start': list(start), 'end': list(end),
+                        'time_ms': elapsed * 1000,
+                        'expansions': expansions(solver),
+                        'found': bool(path), 'cost': cost,
+                        'ratio': ratio, 'scenario_diff': scenario_diff,
+                        'peak_kib': None})
+    if memory:
+        solver = MODES[mode](grid.width, grid.height, cells=cells,
+                             mark_cells=marks, backend=backend, queue=queue,
+                             **SEARCH_OPTIONS)
+        tracemalloc.start()
+        try:
+            for (start, end), record in zip(queries, records):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                solver.a_star_search(start, end)
+                if marks:
+                    solver.clear_marks()
+                peak = tracemalloc.get_traced_memory()[1]
+                record['peak_kib'] = (peak - base) / 1024
+        finally:
+            tracemalloc.stop()
+    return records
+
+
+def summarize(records):
+    """
+    Return dict of totals and averages of per query records. Scenario
+    values are None if records have no scenario lengths.
+    """
+    times = [record['time_ms'] for record in records]
+    ratios = [record['ratio'] for record in records
+              if record['ratio'] is not None]
+    diffs = [record['scenario_diff'] for record in records
+             if record['scenario_diff'] is not None]
+    peaks = [record['peak_kib'] for record in records
+             if record['peak_kib'] is not None]
+    return {'queries': len(records),
+            'found': sum(record['found'] for record in records),
+            'time_ms_total': sum(times),
+            'time_ms_mean': statistics.mean(times) if times else None,
+            'time_ms_median': statistics.median(times) if times else None,
+            'time_ms_max': max(times, default=None),
+            'expansions_total': sum(record['expansions']
+                                    for record in records),
+            'peak_kib_max': max(peaks, default=None),
+            'cost_ratio_mean': statistics.mean(ratios) if ratios else None,
+            'cost_ratio_max': max(ratios, default=None),
+            'optimal': sum(1 for ratio in ratios if abs(ratio - 1) <= 1e-9),
+            'scenario_diff_mean': statistics.mean(diffs) if diffs else None,
+            'scenario_diff_max': max(diffs, default=None),
+            'shorter': (sum(1 for diff in diffs if diff < -1e-9)
+                        if diffs else None)}
+
+
+def run_benchmark(name, grid, queries, modes, optimal=None, memory=True,
+                  per_query=False, marks=False, backend='python',
+                  queue='lazy', lengths=None):
+    """
+    Return list of result dicts, one per mode, for queries on the grid.
+    Optimal path costs are found by Astar with octile costs in Python
+    if not given (None for unreachable ends), so results of the 'numba'
+    backend are checked against the Python one.
+    Lengths of scenario paths are not used as optimal costs: paths here
+    may cut corners of obstacles diagonally and scenarios forbid it.
+    Differences from them are reported apart, queries with paths
+    shorter than the scenario ones are counted as 'shorter'.
+    """
+    if optimal is None:
+        reference = Astar(grid.width, grid.height, cells=grid.cells,
+                          mark_cells=False, **SEARCH_OPTIONS)
+        optimal = []
+        for start, end in queries:
+            path = reference.a_star_search(start, end)
+            optimal.append(path_cost(path) if path else None)
+    results = []
+    for mode in modes:
+        records = run_mode(grid, queries, mode, optimal, memory, marks,
+                           backend, queue, lengths)
+        result = {'map': name, 'width': grid.width, 'height': grid.height,
+                  'mode': mode}
+        result.update(summarize(records))
+        if per_query:
+            result['per_query'] = records
+        results.append(result)
+    return results
+
+
+def run_replan(name, grid, queries, rounds, toggles=10, seed=1):
+    """
+    Return result dict of replanning: for every query the path is found
+    once, then in every round a cell in the middle of the current path
+    is blocked and toggles random cells are flipped, and the new path
+    is found by repairing the search (IncrementalAstar) and by a full
+    A* search. Expansions and time (ms) of both are summed over all
+    rounds; costs of both must be the same.
+    """
+    rng = random.Random(seed)
+    totals = {'incremental_expansions': 0, 'incremental_time_ms': 0,
+              'full_expansions': 0, 'full_time_ms': 0,
+              'replans': 0, 'same_cost': 0}
+    for start, end in queries:
+        cells = grid.cells.copy()
+        repaired = IncrementalAstar(grid.width, grid.height, cells=cells,
+                                    mark_cells=False, **SEARCH_OPTIONS)
+        full = Astar(grid.width, grid.height, cells=cells,
+                     mark_cells=False, **SEARCH_OPTIONS)
+        path = repaired.a_star_search(start, end)
+        for _ in range(rounds):
+            if len(path) > 2:
+                repaired.set_value(*path[len(path) // 2], FULL)
+            for _ in range(toggles):
+                cell = (rng.randrange(grid.height), rng.randrange(grid.width))
+                if cell != start and cell != end:
+                    repaired.set_value(*cell, EMPTY if cells[cell] == FULL
+                                       else FULL)
+            start_time = time.perf_counter()
+            path = repaired.a_star_search(start, end)
+            middle_time = time.perf_counter()
+            full_path = full.a_star_search(start, end)
+            end_time = time.perf_counter()
+            totals['incremental_time_ms'] += (middle_time - start_time) * 1000
+            totals['full_time_ms'] += (end_time - middle_time) * 1000
+            totals['incremental_expansions'] += expansions(repaired)
+            totals['full_expansions'] += expansions(full)
+            totals['replans'] += 1
+            if bool(path) == bool(full_path) and (not path or abs(
+                    path_cost(path) - path_cost(full_path)) < 1e-9):
+                totals['same_cost'] += 1
+    result = {'map': name, 'width': grid.width, 'height': grid.height,
+              'queries': len(queries), 'rounds': rounds,
+              'toggles': toggles}
+    result.update(totals)
+    return result
+
+
+def run_scaling(name, grid, queries, mode, workers, backend='python'):
+    """
+    Return list of result dicts of solving queries by solve_parallel
+    with every number of worker processes in workers: time (s),
+    queries per second and speedup over the first number.
+    Queries are split into four chunks per worker to balance the load.
+    """
+    results = []
+    for count in workers:
+        chunk_size = max(1, -(-len(queries) // (4 * count)))
+        start_time = time.perf_counter()
+        solve_parallel(grid, queries, count, chunk_size, mode=mode,
+                       backend=backend, **SEARCH_OPTIONS)
+        elapsed = time.perf_counter() - start_time
+        results.append({'map': name, 'mode': mode, 'workers': count,
+                        'queries': len(queries), 'time_s': elapsed,
+                        'queries_per_s': (len(queries) / elapsed
+                                          if elapsed else None),
+                        'speedup': (results[0]['time_s'] / elapsed
+                                    if results and elapsed else 1.0)})
+    return results
+
+
+def queue_benchmark(queue, pushes=200000, seed=1):
+    """
+    Return dict of seconds taken by the queue named queue and its size
+    for pushes of random non-negative integer priorities (any queue
+    takes them) on items of which some are already queued, with one
+    pop after every three pushes, and then for popping all items.
+    """
+    rng = random.Random(seed)
+    operations = [(rng.randrange(pushes // 2), rng.randrange(1000))
+                  for _ in range(pushes)]
+    p_queue = QUEUES[queue]()
+    start_time = time.perf_counter()
+    for number, (item, priority) in enumerate(operations, 1):
+        p_queue.push(item, priority)
+        if not number % 3:
+            p_queue.pop()
+    pushed = time.perf_counter()
+    size = len(p_queue)
+    while p_queue:
+        p_queue.pop()
+    return {'queue': queue, 'pushes': pushes, 'items_left': size,
+            'push_pop_s': pushed - start_time,
+            'drain_s': time.perf_counter() - pushed}
+
+
+def parse_args(argv):
+    """ Return parsed command line arguments. """
+    parser = argparse.ArgumentParser(
+        description='Benchmark path search modes on generated maps '
+                    'and Moving AI maps, print JSON results.')
+    parser.add_argument('--maps', default='random,maze,room,open',
+                        help='generated map kinds, comma separated '
+                             '(of {}; empty for none)'.format(
+                                 ', '.join(sorted(MAPS))))
+    parser.add_argument('--sizes', default='64,256',
+                        help='sides of square maps, comma separated')
+    parser.add_argument('--queries', type=int, default=50,
+                        help='queries per map (at most, for scenarios)')
+    parser.add_argument('--radius', type=int,
+                        help='short queries: ends at most that many rows '
+                             'and columns away from starts')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--modes', default='astar',
+                        help='modes, comma separated (of {})'.format(
+                            ', '.join(sorted(MODES))))
+    parser.add_argument('--movingai', nargs=2, action='append', default=[],
+                        metavar=('MAP', 'SCEN'),
+                        help='Moving AI .map file and its .scen file')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip measuring peak memory')
+    parser.add_argument('--backend', choices=BACKENDS, default='python',
+                        help='search backend of modes (numba falls back '
+                             'to python if not installed)')
+    parser.add_argument('--queue', choices=sorted(QUEUES), default='lazy',
+                        help='priority queue of modes (bucket needs '
+                             'integer costs, so only the microbenchmark '
+                             'runs it)')
+    parser.add_argument('--queue-bench', type=int, default=0,
+                        metavar='PUSHES',
+                        help='also compare all queues with that many '
+                             'pushes')
+    parser.add_argument('--replan', type=int, default=0, metavar='ROUNDS',
+                        help='also compare repairing searches with full '
+                             'searches over that many rounds of edits')
+    parser.add_argument('--toggles', type=int, default=10,
+                        help='random cells flipped in every replan round')
+    parser.add_argument('--workers', default='',
+                        help='also solve queries of every map and mode by '
+                             'that many worker processes, comma separated '
+                             '(e.g. 1,2,4; includes starting the pool)')
+    parser.add_argument('--mark-cells', action='store_true',
+                        help='mark searched cells and clear them after '
+                             'every query')
+    parser.add_argument('--per-query', action='store_true',
+                        help='include results of every query')
+    parser.add_argument('-o', '--output', default='-',
+                        help='file for JSON results (default: stdout)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """ Run benchmarks, write JSON and a summary table to stderr. """
+    args = parse_args(argv)
+    modes = [mode for mode in args.modes.split(',') if mode]
+    for mode in modes:
+        if mode not in MODES:
+            raise ValueError('Unknown mode: {}.'.format(mode))
+    kinds = [kind for kind in args.maps.split(',') if kind]
+    for kind in kinds:
+        if kind not in MAPS:
+            raise ValueError('Unknown map: {}.'.format(kind))
+    if args.queue == 'bucket' and (kinds or args.movingai):
+        raise ValueError('Queue bucket needs integer priorities, '
+                         'octile costs of the maps are not.')
+    workers = [int(count) for count in args.workers.split(',') if count]
+    if any(count < 1 for count in workers):
+        raise ValueError('Numbers of workers must be positive.')
+    options = {'memory': not args.no_memory, 'per_query': args.per_query,
+               'marks': args.mark_cells, 'backend': args.backend,
+               'queue': args.queue}
+
+    results = []
+    replans = []
+    scaling = []
+    for kind in kinds:
+        for size in (int(size) for size in args.sizes.split(',')):
+            grid = MAPS[kind](size, args.seed)
+            queries = random_queries(grid, args.queries, args.seed,
+                                     args.radius)
+            name = '{}-{}'.format(kind, size)
+            results += run_benchmark(name, grid, queries, modes, **options)
+            for mode in modes if workers else ():
+                scaling += run_scaling(name, grid, queries, mode, workers,
+                                       args.backend)
+            if args.replan:
+                replans.append(run_replan(name, grid, queries, args.replan,
+                                          args.toggles, args.seed))
+    for map_name, scen_name in args.movingai:
+        with open(map_name) as map_file:
+            grid = grid_from_text(map_file)
+        with open(scen_name) as scen_file:
+            scenario = read_scenario(scen_file)[:args.queries]
+        queries = [(start, end) for start, end, _length in scenario]
+        lengths = [length for _start, _end, length in scenario]
+        results += run_benchmark(map_name, grid, queries, modes,
+                                 lengths=lengths, **options)
+        for mode in modes if workers else ():
+            scaling += run_scaling(map_name, grid, queries, mode, workers,
+                                   args.backend)
+
+    report = {'python': platform.python_version(),
+              'numpy': np.__version__,
+              'platform': platform.platform(),
+              'seed': args.seed,
+              'radius': args.radius,
+              'mark_cells': args.mark_cells,
+              'backend': args.backend,
+              'queue': args.queue,
+              'options': {'diagonal_cost': SEARCH_OPTIONS['diagonal_cost'],
+                          'heuristic': SEARCH_OPTIONS['heuristic'],
+                          # Moving AI lengths forbid it, see 'shorter'.
+                          'corner_cutting': True},
+              'results': results,
+              'replan': replans,
+              'scaling': scaling,
+              'queues': [queue_benchmark(queue, args.queue_bench, args.seed)
+                         for queue in sorted(QUEUES) if args.queue_bench]}
+    text = json.dumps(report, indent=1)
+    if args.output == '-':
+        sys.stdout.write(text + '\n')
+    else:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+
+    for result in results:
+        line = ('{map:>14} {mode:>13}: {found}/{queries} found, '
+                '{time_ms_mean:.2f} ms/query, {expansions_total} '
+                'expansions, {optimal} optimal'.format(**result))
+        if result['shorter'] is not None:
+            line += (', {shorter} shorter than scenario (mean difference '
+                     '{scenario_diff_mean:+.3f})'.format(**result))
+        print(line, file=sys.stderr)
+    for result in scaling:
+        print('{map:>14} {mode:>13}: {workers} workers, '
+              '{queries_per_s:.1f} queries/s, {speedup:.2f}x'.format(
+                  **result), file=sys.stderr)
+    for result in replans:
+        print('{map:>14}        replan: {incremental_expansions} vs '
+              '{full_expansions} expansions, {incremental_time_ms:.0f} vs '
+              '{full_time_ms:.0f} ms, {same_cost}/{replans} same cost'.format(
+                  **result), file=sys.stderr)
+    for result in report['queues']:
+        print('{queue:>14}: {push_pop_s:.3f}s pushes and pops, '
+              '{drain_s:.3f}s drain of {items_left} items'.format(**result),
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+""" Bidirectional A* search for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+
+from a_star_context import SearchContext
+from a_star_engine import (Astar, FULL, SEARCH, BACK_SEARCH, INF,
+                           LAZY_H_CELLS)
+from a_star_heuristics import heuristic_field, HeuristicCells
+
+
+class BidirectionalAstar(Astar):
+    """
+    A* searching forward from the start and backward from the end at
+    once, every step expanding the side with fewer open cells.
+    Each side has its own priority queue, g(x), predecessors and
+    closed cells. Both use the average of heuristics to the end (h_e)
+    and to the start (h_s) as potentials: (h_e - h_s + h_e(start)) / 2
+    forward and (h_s - h_e + h_e(start)) / 2 backward, so that they
+    agree on every path and the frontiers meet in the middle.
+    Whenever a cell gets g(x) on one side and is reached by the other,
+    the sum is a path cost; the best one (and its meeting cell) is kept.
+    The search stops when the sum of the lowest priorities of both
+    sides is not below the best cost plus h_e(start): no path through
+    open cells is cheaper. Paths are optimal for a consistent
+    heuristic (the default one is); weight is not used.
+    """
+
+    def __init__(self, grid_width, grid_height, obstacle_list=None,
+                 start_pos=None, end_pos=None, diagonal_cost=math.sqrt(2),
+                 heuristic=None, **options):
+        """ Create a simulation like Astar with diagonal cost sqrt(2). """
+        Astar.__init__(self, grid_width, grid_height, obstacle_list,
+                       start_pos, end_pos, diagonal_cost, heuristic,
+                       **options)
+        # Backward state; successors of cells towards the end are kept
+        # in back_came_from and costs of paths to the end in back_g_score.
+        self.back_context = SearchContext(options.get('queue', 'lazy'))
+        self.back_queue = self.back_context.p_queue
+        self.back_came_from = self.back_context.came_from
+        self.back_g_score = self.back_context.g_score
+        self.back_closed = self.back_context.closed
+        self.h_forward = None       # potentials of cells for both sides
+        self.h_backward = None
+        self.h_start = 0            # heuristic distance from start to end
+        self.best_cost = INF        # cost of the best path found so far
+        self.meet = None            # cell of the best path on both sides
+        self.expansions = 0         # cells expanded by both sides
+
+    def clear_p_queue(self):
+        """ Clear priority queues and all search state. """
+        Astar.clear_p_queue(self)
+        self.back_context.clear()
+        self.h_forward = None
+        self.h_backward = None
+        self.best_cost = INF
+        self.meet = None
+        self.expansions = 0
+
+    def init_search(self, start_pos):
+        """
+        Put start position into empty forward queue. The backward
+        side starts from the end on the first iteration.
+        """
+        self.clear_p_queue()
+        Astar.init_search(self, start_pos)
+
+    def start_backward(self, start_pos, end_pos):
+        """
+        Compute potentials of both sides and put end position into
+        empty backward queue unless it is FULL: no path ends there.
+        """
+        end = self.to_index(end_pos)
+        if self.width * self.height >= LAZY_H_CELLS:
+            # Big grids: potentials are computed on lookup (see Astar).
+            to_end = HeuristicCells(self.width, end_pos, self.heuristic,
+                                    1, self.diagonal_cost)
+            to_start = HeuristicCells(self.width, start_pos, self.heuristic,
+                                      1, self.diagonal_cost)
+            self.h_start = to_end[self.to_index(start_pos)]
+            self.h_forward = PotentialCells(to_end, to_start, self.h_start)
+            self.h_backward = PotentialCells(to_start, to_end, self.h_start)
+        else:
+            to_end = heuristic_field(self.width, self.height, end_pos,
+                                     self.heuristic, 1, self.diagonal_cost)
+            to_start = heuristic_field(self.width, self.height, start_pos,
+                                       self.heuristic, 1, self.diagonal_cost)
+            self.h_start = float(to_end[tuple(start_pos)])
+            # Both are not negative by the triangle inequality.
+            self.h_forward = memoryview(
+                ((to_end - to_start + self.h_start) / 2).reshape(-1))
+            self.h_backward = memoryview(
+                ((to_start - to_end + self.h_start) / 2).reshape(-1))
+        if self.flat[end] == FULL:
+            return  # the backward side is done at once
+        self.back_g_score[end] = 0
+        self.back_queue.push(end, self.h_backward[end])
+        if end in self.g_score:     # start is the end
+            self.best_cost = 0
+            self.meet = end
+
+    def a_star_search_iter(self, start_pos, end_pos):
+        """
+        Execute one iteration: expand a cell of the side with fewer
+        open cells. Set self.is_over if the best path is found.
+        Both queues are left empty when the search is finished.
+        """
+        if self.h_forward is None:
+            self.start_backward(start_pos, end_pos)
+        forward, backward = self.p_queue, self.back_queue
+        stats = self.stats
+        if stats is not None:
+            stale_pops = forward.stale_pops + backward.stale_pops
+        if (not forward or not backward
+                or forward.min_priority(INF) + backward.min_priority(INF)
+                >= self.best_cost + self.h_start):
+            self.is_over = self.best_cost < INF
+            forward.clear()
+            backward.clear()
+            side = None
+        elif len(forward) <= len(backward):
+            side = (forward.pop(), self.g_score, self.came_from,
+                    self.closed, forward, self.h_forward,
+                    self.back_g_score, SEARCH)
+        else:
+            side = (backward.pop(), self.back_g_score, self.back_came_from,
+                    self.back_closed, backward, self.h_backward,
+                    self.g_score, BACK_SEARCH)
+        if stats is not None:
+            stats.stale_pops += (forward.stale_pops + backward.stale_pops
+                                 - stale_pops)
+        if side is None:
+            return
+        if stats is None:
+            self.expand_side(*side)
+        else:
+            self.count_expand(side[0], side[4], side[1], self.expand_side,
+                              *side)
+
+    def expand_side(self, cur_cell, g_score, came_from, closed, p_queue,
+                    h_field, other_g_score, mark_value):
+        """
+        Close the cell cur_cell of one side and relax its neighbors,
+        updating the best path where they meet the other side.
+        """
+        closed.add(cur_cell)
+        self.expansions += 1
+        cur_g = g_score[cur_cell]
+        flat = self.flat
+        mark = self.mark_cells
+        for offset, step in self.move_table[self.border_key(cur_cell)]:
+            neighbor = cur_cell + offset
+            if neighbor in closed or flat[neighbor] == FULL:
+                continue
+            g_x = cur_g + step
+            if g_x < g_score.get(neighbor, INF):
+                g_score[neighbor] = g_x
+                came_from[neighbor] = cur_cell
+                p_queue.push(neighbor, g_x + h_field[neighbor])
+                if mark:
+                    self.mark_search(neighbor, mark_value)
+                cost = g_x + other_g_score.get(neighbor, INF)
+                if cost < self.best_cost:
+                    self.best_cost = cost
+                    self.meet = neighbor
+
+    def reconstruct_path(self, current):
+        """
+        Return path of (row, col) cells from start to current cell
+        (the end) through the meeting cell of both sides.
+        """
+        if self.meet is None:
+            return Astar.reconstruct_path(self, current)
+        path = Astar.reconstruct_path(self, self.to_cell(self.meet))
+        cell = self.meet
+        while cell in self.back_came_from:
+            cell = self.back_came_from[cell]
+            path.append(divmod(cell, self.width))
+        return path
+
+
+class PotentialCells(dict):
+    """
+    Potentials of one side of BidirectionalAstar looked up by flat
+    index: (to_goal - to_source + h_start) / 2 of heuristic values
+    (HeuristicCells) to the goal and to the source of the side,
+    computed on first lookup of every cell and kept.
+    """
+
+    def __init__(self, to_goal, to_source, h_start):
+        """ Create empty potentials from heuristic values of both ends. """
+        dict.__init__(self)
+        self.to_goal = to_goal
+        self.to_source = to_source
+        self.h_start = h_start
+
+    def __missing__(self, idx):
+        value = (self.to_goal[idx] - self.to_source[idx] + self.h_start) / 2
+        self[idx] = value
+        return value
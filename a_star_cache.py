@@ -0,0 +1,106 @@
+""" Cache of found paths for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+from collections import OrderedDict
+
+
+class PathCache:
+    """
+    Size-bounded cache of paths with least recently used eviction.
+    Paths are keyed by (version, start, end, params): version of
+    the grid they were found on, (row, col) ends and search parameters
+    (heuristic, weight, diagonal cost). Old versions are never looked
+    up again and leave the cache as the least recently used.
+    """
+
+    def __init__(self, maxsize=1024):
+        """ Create an empty cache holding up to maxsize paths. """
+        self.maxsize = maxsize
+        self.paths = OrderedDict()  # keys in order of use, oldest first
+        self.positions = {} # mapping of keys to {cell: index in path}
+        self.on_path = {}   # (version, params, cell): keys of paths with cell
+        self.hits = 0       # lookups answered with a whole cached path
+        self.subpath_hits = 0   # lookups answered with a part of a path
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    def clear(self):
+        """ Remove all paths and reset counters. """
+        self.paths.clear()
+        self.positions.clear()
+        self.on_path.clear()
+        self.hits = self.subpath_hits = self.misses = 0
+
+    def get(self, version, start, end, params, subpaths=False):
+        """
+        Return a copy of the cached path from start to end or None.
+        With subpaths a part of a cached path through both ends is
+        returned too (it is optimal if the cached path is optimal).
+        """
+        key = (version, start, end, params)
+        path = self.paths.get(key)
+        if path is not None:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            return list(path)
+        if subpaths:
+            for key in self.on_path.get((version, params, start), ()):
+                positions = self.positions[key]
+                last = positions.get(end)
+                if last is None:
+                    continue
+                first = positions[start]
+                path = self.paths[key]
+                self.paths.move_to_end(key)
+                self.subpath_hits += 1
+                if first <= last:
+                    return path[first:last + 1]
+                # Moves cost the same both ways, so a path may be reversed.
+                return path[last:first + 1][::-1]
+        self.misses += 1
+        return None
+
+    def put(self, version, start, end, params, path, subpaths=False):
+        """
+        Store a copy of the path, evicting the least recently used.
+        With subpaths its cells are indexed for lookups of its parts.
+        """
+        key = (version, start, end, params)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            return
+        self.paths[key] = list(path)
+        if subpaths:
+            self.positions[key] = {cell: idx for idx, cell in enumerate(path)}
+            for cell in path:
+                self.on_path.setdefault((version, params, cell),
+                                        set()).add(key)
+        while len(self.paths) > self.maxsize:
+            self.evict()
+
+    def evict(self):
+        """ Remove the least recently used path. """
+        key, _path = self.paths.popitem(last=False)
+        version, _start, _end, params = key
+        for cell in self.positions.pop(key, ()):
+            keys = self.on_path[(version, params, cell)]
+            keys.discard(key)
+            if not keys:
+                del self.on_path[(version, params, cell)]
+
+    def stats(self):
+        """ Return dict of counters: hits, subpath_hits, misses, size. """
+        return {'hits': self.hits, 'subpath_hits': self.subpath_hits,
+                'misses': self.misses, 'size': len(self.paths)}
@@ -0,0 +1,257 @@
+""" Connected components of free cells for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import numpy as np
+
+
+FULL = 1    # the only value of cells that can not be passed
+
+MAX_CELL_UPDATES = 64   # more cells changed at once rebuild the index
+
+
+def merge_runs(count, first, second):
+    """
+    Return array of roots of count items joined by pairs of arrays
+    first and second (union-find done for all pairs at once): every
+    root is the lowest item of its set.
+    """
+    parent = np.arange(count)
+    while True:
+        first_root, second_root = parent[first], parent[second]
+        differ = first_root != second_root
+        if not differ.any():
+            return parent
+        first, second = first[differ], second[differ]
+        lower = np.minimum(first_root[differ], second_root[differ])
+        higher = np.maximum(first_root[differ], second_root[differ])
+        # Every root joins the lowest root it is paired with...
+        np.minimum.at(parent, higher, lower)
+        # ...and pointers jump until all of them point at roots.
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def label_components(free, diagonal=True):
+    """
+    Return (labels, count): int32 array of component labels 1..count
+    of free cells (True in the 2D array free), 0 for blocked cells.
+    Cells are connected by horizontal and vertical moves, and by
+    diagonal ones too if diagonal.
+    Runs of free cells along rows are joined where they touch.
+    """
+    height, width = free.shape
+    left = np.zeros_like(free)
+    left[:, 1:] = free[:, :-1]
+    starts = free & ~left
+    run_of = np.cumsum(starts.reshape(-1)).reshape(height, width) - 1
+    count = int(run_of[-1, -1]) + 1 if free.size else 0
+    if not count:
+        return np.zeros((height, width), dtype=np.int32), 0
+
+    # Runs of adjacent rows touch once per overlapping segment.
+    upper, lower = free[:-1], free[1:]
+    both = upper & lower
+    prev = np.zeros_like(both)
+    prev[:, 1:] = both[:, :-1]
+    rows, cols = np.nonzero(both & ~prev)
+    pairs = [(run_of[rows, cols], run_of[rows + 1, cols])]
+    if diagonal:
+        # Diagonal moves matter only between runs that do not touch.
+        rows, cols = np.nonzero(upper[:, :-1] & lower[:, 1:]
+                                & ~upper[:, 1:] & ~lower[:, :-1])
+        pairs.append((run_of[rows, cols], run_of[rows + 1, cols + 1]))
+        rows, cols = np.nonzero(upper[:, 1:] & lower[:, :-1]
+                                & ~upper[:, :-1] & ~lower[:, 1:])
+        pairs.append((run_of[rows, cols + 1], run_of[rows + 1, cols]))
+    first = np.concatenate([pair[0] for pair in pairs])
+    second = np.concatenate([pair[1] for pair in pairs])
+
+    roots = merge_runs(count, first, second)
+    is_root = roots == np.arange(count)
+    run_labels = np.cumsum(is_root, dtype=np.int32)[roots]
+    labels = np.where(free, run_labels[np.maximum(run_of, 0)], 0)
+    return labels.astype(np.int32), int(is_root.sum())
+
+
+class ComponentIndex:
+    """
+    Labels of connected components of free (not FULL) cells of a grid,
+    so that a path between cells of different components is known not
+    to exist at once. Cells are 8-connected as in Astar (4-connected
+    without diagonal).
+    Changes of cells are applied incrementally: a freed cell joins the
+    components around it (labels are merged through union-find of
+    labels), a blocked cell can split its component only if its free
+    neighbors are not connected around it, and only then the component
+    is labeled again. The index is rebuilt on the next query if cells
+    changed without it (the grid version differs).
+    """
+
+    def __init__(self, grid, diagonal=True):
+        """ Create index of components of the grid cells. """
+        self.grid = grid
+        self.diagonal = diagonal
+        if diagonal:
+            self.moves = [(d_row, d_col) for d_row in (-1, 0, 1)
+                          for d_col in (-1, 0, 1) if d_row or d_col]
+        else:
+            self.moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        self.rebuild()
+
+    def rebuild(self):
+        """ Label all components of the grid anew. """
+        labels, count = label_components(self.grid.cells != FULL,
+                                         self.diagonal)
+        self.labels = labels
+        self.flat = memoryview(labels.reshape(-1))
+        self.parent = list(range(count + 1))    # merged labels, 0 unused
+        self.version = self.grid.version
+
+    def find(self, label):
+        """ Return the label all labels merged with the label stand for. """
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]   # path halving
+            label = parent[label]
+        return label
+
+    def component(self, cell):
+        """ Return component label of the cell (row, col), 0 if FULL. """
+        if self.version != self.grid.version:
+            self.rebuild()
+        return self.find(self.flat[self.grid.to_index(cell)])
+
+    def connected(self, start, end):
+        """ Check whether a path from start to end cell may exist. """
+        label = self.component(start)
+        return label != 0 and label == self.component(end)
+
+    def neighbors(self, idx):
+        """ Return flat indices of free neighbors of the cell idx. """
+        width, height = self.grid.width, self.grid.height
+        row, col = divmod(idx, width)
+        flat = self.flat
+        ans = []
+        for d_row, d_col in self.moves:
+            n_row, n_col = row + d_row, col + d_col
+            if 0 <= n_row < height and 0 <= n_col < width:
+                neighbor = n_row * width + n_col
+                if flat[neighbor]:
+                    ans.append(neighbor)
+        return ans
+
+    def splits(self, idx):
+        """
+        Check whether blocking the cell idx may disconnect its free
+        neighbors: they are connected through the cells around idx
+        (its 3x3 block without idx) unless this returns True.
+        """
+        width, height = self.grid.width, self.grid.height
+        row, col = divmod(idx, width)
+        around = {(row + d_row, col + d_col)
+                  for d_row in (-1, 0, 1) for d_col in (-1, 0, 1)
+                  if (d_row or d_col) and 0 <= row + d_row < height
+                  and 0 <= col + d_col < width
+                  and self.flat[(row + d_row) * width + col + d_col]}
+        targets = {divmod(neighbor, width)
+                   for neighbor in self.neighbors(idx)}
+        if len(targets) < 2:
+            return False
+        first = targets.pop()
+        seen, stack = {first}, [first]
+        while stack:
+            n_row, n_col = stack.pop()
+            for d_row, d_col in self.moves:
+                cell = (n_row + d_row, n_col + d_col)
+                if cell in around and cell not in seen:
+                    seen.add(cell)
+                    stack.append(cell)
+        return not targets <= seen
+
+    def set_free(self, idx, version):
+        """
+        Update components after the cell idx became free (not FULL).
+        Version is the grid version before the change.
+        """
+        if self.version != version:
+            return  # rebuilt on the next query
+        if not self.flat[idx]:
+            roots = {self.find(self.flat[neighbor])
+                     for neighbor in self.neighbors(idx)}
+            if roots:
+                label = min(roots)
+                for root in roots:
+                    self.parent[root] = label
+            else:
+                label = len(self.parent)
+                self.parent.append(label)
+            self.flat[idx] = label
+        self.version = self.grid.version
+
+    def set_blocked(self, idx, version):
+        """
+        Update components after the cell idx became FULL.
+        Version is the grid version before the change.
+        """
+        if self.version != version:
+            return
+        label = self.flat[idx]
+        if label:
+            split = self.splits(idx)
+            self.flat[idx] = 0
+            if split:
+                self.relabel(self.find(label))
+        self.version = self.grid.version
+
+    def relabel(self, label):
+        """ Label pieces of the component label; one keeps the label. """
+        parent = np.array(self.parent)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        region = parent[self.labels] == label
+        pieces, count = label_components(region, self.diagonal)
+        new_labels = np.arange(len(self.parent) - 1,
+                               len(self.parent) + count - 1, dtype=np.int32)
+        new_labels[0] = label
+        self.parent.extend(range(len(self.parent),
+                                 len(self.parent) + count - 1))
+        self.labels[region] = new_labels[pieces[region] - 1]
+
+    def set_cells(self, changed, free, version):
+        """
+        Update components after cells with flat indices changed became
+        free (or FULL if not free), with array assignment.
+        Version is the grid version before the change.
+        """
+        if self.version != version:
+            return
+        labels = self.labels.reshape(-1)
+        if free:
+            flips = changed[labels[changed] == 0]
+        else:
+            flips = changed[labels[changed] != 0]
+        if len(flips) > MAX_CELL_UPDATES:
+            self.rebuild()
+            return
+        for idx in flips.tolist():
+            if free:
+                self.set_free(idx, self.version)
+            else:
+                self.set_blocked(idx, self.version)
+        self.version = self.grid.version
@@ -0,0 +1,40 @@
+""" Reusable search state for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+from a_star_queues import QUEUES
+
+
+class SearchContext:
+    """
+    State of one search keyed by flat cell indices: priority queue
+    of open cells, predecessors, g(x) and closed cells.
+    The same containers are kept for all searches and emptied in place
+    by clear, which costs as much as the cells the last search touched,
+    so solvers may keep references to them (Astar does).
+    """
+
+    def __init__(self, queue='lazy'):
+        """ Create empty state with a priority queue named queue. """
+        if queue not in QUEUES:
+            raise ValueError('Unknown queue: {}.'.format(queue))
+        self.p_queue = QUEUES[queue]()  # open cells by priority
+        self.came_from = {} # dictionary of predecessors for every cell
+        self.g_score = {}   # cost of the cheapest known path to every cell
+        self.closed = set() # expanded cells, never reopened
+
+    def clear(self):
+        """ Empty all containers in place. """
+        self.p_queue.clear()
+        self.came_from.clear()
+        self.g_score.clear()
+        self.closed.clear()
@@ -0,0 +1,674 @@
+""" A* path search engine: grid and search without any GUI. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+from itertools import chain
+import numpy as np
+
+from a_star_cache import PathCache
+from a_star_components import ComponentIndex
+from a_star_context import SearchContext
+from a_star_heuristics import (heuristic_field, is_admissible,
+                               default_heuristic, HeuristicCells)
+from a_star_kernel import make_kernel
+
+
+# global constants
+EMPTY = 0
+FULL = 1
+START = 2
+END = 3
+SEARCH = 4
+PATH = 5
+BACK_SEARCH = 6 # seen by backward search of BidirectionalAstar
+MARKS = (SEARCH, PATH, BACK_SEARCH)  # values left by searches
+
+# Grids of at least that many cells get heuristic values computed per
+# cell (HeuristicCells) instead of a whole field for every end.
+LAZY_H_CELLS = 1 << 22
+
+BLOCKED_CHARS = '@OTW#'  # obstacles in text maps
+
+INF = float('inf')  # cost of a cell that is not reached yet
+
+# (row, col) offsets of moves to neighbor cells
+FOUR_MOVES = ((-1, 0), (1, 0), (0, -1), (0, 1))
+EIGHT_MOVES = tuple((row_offset, col_offset)
+                    for row_offset in range(-1, 2)
+                    for col_offset in range(-1, 2)
+                    if (row_offset, col_offset) != (0, 0))
+
+
+def unique_indices(idx):
+    """
+    Return sorted array of flat indices without repeats. Faster than
+    np.unique, which hashes the values first.
+    """
+    idx = np.sort(idx)
+    if len(idx) > 1:
+        idx = idx[np.concatenate(([True], idx[1:] != idx[:-1]))]
+    return idx
+
+
+class Grid:
+    """ Numpy implementation of 2D grid of cells. """
+    
+    def __init__(self, width, height, cells=None):
+        """
+        Initialize grid to be empty with given width and height.
+        Indexed by rows (top to bottom), then by columns (left to right).
+        Every cell also has a flat index: row * width + col.
+        Existing C-contiguous uint8 array of cells may be shared instead.
+        """
+        self.width = width
+        self.height = height
+        if cells is None:
+            # Initialize grid with EMPTY values.
+            cells = np.zeros((height, width), dtype=np.uint8)  # rows as y
+        self.cells = cells
+        # Flat view of the same memory; indexing returns plain ints.
+        self.flat = memoryview(self.cells.reshape(-1))
+        # Changed by set_value, clear and clear_from; increase it after
+        # writing to self.cells directly.
+        self.version = 0
+        # Flat indices of cells changed since a GUI drew them (None when
+        # nobody tracks changes).
+        self.dirty = None
+        # Flat indices of cells set to MARKS values since the last
+        # clear_marks (some may be changed again since then).
+        self.marked = []
+
+        self.four_table = self.build_neighbor_tables(FOUR_MOVES)
+        self.eight_table = self.build_neighbor_tables(EIGHT_MOVES)
+    
+    def get_grid_height(self):
+        """ Return the height of the grid for use in GUI. """
+        return self.height
+
+    def get_grid_width(self):
+        """ Return the width of the grid for use in GUI. """
+        return self.width
+
+    def clear(self):
+        """ Clear grid to be empty. """
+        if self.dirty is not None:
+            self.dirty.update(np.flatnonzero(self.cells).tolist())
+        self.cells[:] = EMPTY
+        self.marked.clear()
+        self.version += 1
+    
+    def clear_from(self, value):
+        """ Update grid cells containing the value to EMPTY values. """
+        found = self.cells == value
+        if self.dirty is not None:
+            self.dirty.update(np.flatnonzero(found).tolist())
+        self.cells[found] = EMPTY
+        self.version += 1
+        if value in MARKS:
+            self.prune_marked()
+
+    def prune_marked(self):
+        """
+        Drop cells that do not hold MARKS values any more and repeated
+        cells from self.marked, so that it does not grow when marks are
+        cleared by value and set again.
+        """
+        marked = unique_indices(np.fromiter(self.marked, dtype=np.intp,
+                                            count=len(self.marked)))
+        values = self.cells.reshape(-1)[marked]
+        self.marked[:] = marked[np.isin(values, MARKS)].tolist()
+
+    def clear_marks(self):
+        """
+        Update cells left by searches (SEARCH, BACK_SEARCH and PATH
+        values) to EMPTY values like clear_from for each of them, but
+        only cells in self.marked are visited, not the whole grid.
+        """
+        marked = np.fromiter(self.marked, dtype=np.intp,
+                             count=len(self.marked))
+        self.marked.clear()
+        flat = self.cells.reshape(-1)
+        values = flat[marked]
+        found = marked[(values == SEARCH) | (values == PATH)
+                       | (values == BACK_SEARCH)]
+        if self.dirty is not None:
+            self.dirty.update(found.tolist())
+        flat[found] = EMPTY
+        self.version += 1
+    
+    def set_value(self, row, col, value):
+        """ Set the cell with index (row, col) equal to value. """
+        idx = row * self.width + col
+        if self.flat[idx] != value:
+            self.flat[idx] = value
+            self.version += 1
+            if self.dirty is not None:
+                self.dirty.add(idx)
+            if value in MARKS:
+                self.marked.append(idx)
+
+    def cell_indices(self, cells):
+        """
+        Return numpy array of flat indices of cells given as a boolean
+        array of the grid shape (mask) or as (row, col) pairs (an array
+        of shape (n, 2) or any iterable).
+        Raise IndexError if a cell is outside the grid.
+        """
+        if not isinstance(cells, np.ndarray):
+            # Much faster than np.asarray for a list of tuples.
+            cells = list(cells)
+            cells = np.fromiter(chain.from_iterable(cells), dtype=np.intp,
+                                count=2 * len(cells))
+        if cells.dtype == bool:
+            if cells.shape != self.cells.shape:
+                raise ValueError('Mask shape {} differs from the grid '
+                                 'shape {}.'.format(cells.shape,
+                                                    self.cells.shape))
+            return np.flatnonzero(cells)
+        cells = cells.reshape(-1, 2).astype(np.intp)
+        rows, cols = cells[:, 0], cells[:, 1]
+        outside = ((rows < 0) | (rows >= self.height)
+                   | (cols < 0) | (cols >= self.width))
+        if outside.any():
+            cell = tuple(cells[np.argmax(outside)].tolist())
+            raise IndexError('Cell {} is outside the grid.'.format(cell))
+        return rows * self.width + cols
+
+    def set_values(self, cells, value):
+        """
+        Set all the cells (see cell_indices) equal to value at once
+        with array assignment, e.g. to add obstacles from a mask.
+        Return numpy array of flat indices of cells that changed.
+        """
+        flat = self.cells.reshape(-1)
+        # Only the given cells are looked at, not the whole grid.
+        idx = unique_indices(self.cell_indices(cells))
+        changed = idx[flat[idx] != value]
+        if len(changed):
+            flat[changed] = value
+            self.version += 1
+            if self.dirty is not None:
+                self.dirty.update(changed.tolist())
+            if value in MARKS:
+                self.marked.extend(changed.tolist())
+        return changed
+
+    def mark_search(self, idx, value=SEARCH):
+        """
+        Mark EMPTY cell with flat index as SEARCH (seen by a search).
+        It is not a change of the map, so version stays the same.
+        """
+        if self.flat[idx] == EMPTY:
+            self.flat[idx] = value
+            self.marked.append(idx)
+            if self.dirty is not None:
+                self.dirty.add(idx)
+    
+    def get_idx_value_pairs(self):
+        """ Return an iterator yielding pairs of array indices and values. """
+        return np.ndenumerate(self.cells)
+    
+    def is_empty(self, row, col):
+        """ Check whether cell with index (row, col) is empty. """
+        return self.flat[row * self.width + col] == EMPTY
+    
+    def check_cell(self, cell):
+        """ Raise IndexError if the cell (row, col) is outside the grid. """
+        if not (0 <= cell[0] < self.height and 0 <= cell[1] < self.width):
+            raise IndexError('Cell {} is outside the grid.'.format(cell))
+
+    def to_index(self, cell):
+        """ Return flat index of the cell (row, col). """
+        return cell[0] * self.width + cell[1]
+
+    def to_cell(self, idx):
+        """ Return (row, col) of the cell with flat index. """
+        return divmod(idx, self.width)
+
+    def border_key(self, idx):
+        """
+        Return number 0..15 encoding which grid borders
+        the cell with flat index touches (top, bottom, left, right).
+        """
+        row, col = divmod(idx, self.width)
+        return ((row == 0) | (row == self.height - 1) << 1
+                | (col == 0) << 2 | (col == self.width - 1) << 3)
+
+    def build_neighbor_tables(self, moves, diagonal_cost=1):
+        """
+        Return 16 lists of (flat index offset, move cost) pairs,
+        one list per border_key, without moves leaving the grid.
+        """
+        tables = []
+        for key in range(16):
+            top, bottom, left, right = (key & 1, key & 2, key & 4, key & 8)
+            table = []
+            for row_offset, col_offset in moves:
+                if ((top and row_offset < 0) or (bottom and row_offset > 0)
+                        or (left and col_offset < 0)
+                        or (right and col_offset > 0)):
+                    continue
+                cost = diagonal_cost if row_offset and col_offset else 1
+                table.append((row_offset * self.width + col_offset, cost))
+            tables.append(table)
+        return tables
+
+    def four_neighbors(self, row, col):
+        """
+        Return horiz/vert neighbors of the cell (row, col).
+        """
+        idx = row * self.width + col
+        return [divmod(idx + offset, self.width)
+                for offset, _cost in self.four_table[self.border_key(idx)]]
+
+    def eight_neighbors(self, row, col):
+        """
+        Return horiz/vert and diagonal neighbors of the cell (row, col).
+        """
+        idx = row * self.width + col
+        return [divmod(idx + offset, self.width)
+                for offset, _cost in self.eight_table[self.border_key(idx)]]
+    
+    def get_index(self, point, cell_size):
+        """ Return index of a cell by its screen coordinates. """
+        return (point[1] // cell_size, point[0] // cell_size)
+    
+    def __str__(self):
+        """ Return multi-line string represenation of grid. """
+        ans = '\n'.join(str(self.cells[row]) for row in range(self.height))
+        return ans + '\n'
+
+
+class Astar(Grid):
+    """
+    Class for simulating A* path search algorithm on grid with obstacles.
+    """
+
+    def __init__(self, grid_width, grid_height, obstacle_list=None,
+                 start_pos=None, end_pos=None, diagonal_cost=1,
+                 heuristic=None, weight=1, cells=None,
+                 mark_cells=True, queue='lazy', cache_size=0,
+                 components=False, backend='python'):
+        """
+        Create a simulation of given size with given obstacles
+        ((row, col) pairs or a boolean mask), start and end positions.
+        Diagonal moves cost diagonal_cost (e.g. math.sqrt(2)),
+        horizontal and vertical moves cost 1.
+        Heuristic is a name from a_star_heuristics.HEURISTICS; by default
+        it is one that finds optimal paths for the diagonal cost (see
+        default_heuristic). Other heuristics may give longer paths, e.g.
+        euclidean with diagonal_cost=1 overestimates diagonal moves.
+        Weight > 1 makes weighted A* (faster, paths may be longer).
+        Search runs on the given cells array if any. Without mark_cells
+        it leaves cell values unchanged (no SEARCH and PATH cells).
+        Queue is a name of priority queue from a_star_queues.QUEUES.
+        With cache_size a_star_search keeps up to that many found paths
+        until the grid version changes (see a_star_cache.PathCache).
+        Search work is counted only if self.stats is set to
+        an a_star_stats.SearchStats.
+        With components a_star_search rejects ends in different
+        connected components at once (see a_star_components).
+        Backend 'numba' runs a_star_search in compiled code (see
+        a_star_kernel) when cells are not marked and work is not counted;
+        without numba installed searches run in Python as with 'python'.
+        """
+        Grid.__init__(self, grid_width, grid_height, cells)
+        self.mark_cells = mark_cells
+        self.components = None  # ComponentIndex kept up to date if set
+        
+        if obstacle_list is not None:
+            self.set_values(obstacle_list, FULL)
+        
+        if start_pos is not None:
+            self.set_value(start_pos[0], start_pos[1], START)
+        if end_pos is not None:
+            self.set_value(end_pos[0], end_pos[1], END)
+        self.start_end_points = (start_pos, end_pos)
+        if components:
+            self.components = ComponentIndex(self)
+        self.diagonal_cost = diagonal_cost
+        self.move_table = self.build_neighbor_tables(EIGHT_MOVES,
+                                                     diagonal_cost)
+        if heuristic is None:
+            heuristic = default_heuristic(diagonal_cost)
+        self.heuristic = heuristic
+        self.weight = weight
+        self.h_field = None # heuristic values of all cells for self.h_key
+        self.h_key = None
+    
+        # Search state is reused by all searches and cleared in place;
+        # the attributes below refer to the containers of the context.
+        self.context = SearchContext(queue)
+        self.p_queue = self.context.p_queue
+        self.came_from = self.context.came_from
+        self.g_score = self.context.g_score
+        self.closed = self.context.closed
+        self.path_cache = PathCache(cache_size) if cache_size else None
+        self.stats = None   # SearchStats counting search work if set
+        self.kernel = make_kernel(self, backend)    # None for Python
+
+        self.is_over = False
+    
+    def get_start_end_points(self):
+        """ Return initial(!) start and end positions. """
+        return self.start_end_points
+    
+    def clear(self):
+        """ Clear all the grid. """
+        Grid.clear(self)
+
+        self.is_over = False
+
+        self.clear_p_queue()
+    
+    def clear_from(self, value):
+        """ Update grid cells containing the value to EMPTY values. """
+        version = self.version
+        Grid.clear_from(self, value)
+        if (self.components is not None and value != FULL
+                and self.components.version == version):
+            self.components.version = self.version  # no cell got free
+
+    def clear_marks(self):
+        """ Clear cells left by searches, components stay valid. """
+        version = self.version
+        Grid.clear_marks(self)
+        if (self.components is not None
+                and self.components.version == version):
+            self.components.version = self.version
+
+    def set_value(self, row, col, value):
+        """ Set the cell value and update components if there are. """
+        components = self.components
+        if components is None:
+            Grid.set_value(self, row, col, value)
+            return
+        version = self.version
+        Grid.set_value(self, row, col, value)
+        if self.version != version:
+            if value == FULL:
+                components.set_blocked(row * self.width + col, version)
+            else:
+                components.set_free(row * self.width + col, version)
+
+    def set_values(self, cells, value):
+        """ Set the cells at once and update components if there are. """
+        version = self.version
+        changed = Grid.set_values(self, cells, value)
+        if self.components is not None and len(changed):
+            self.components.set_cells(changed, value != FULL, version)
+        return changed
+
+    def clear_p_queue(self):
+        """ Clear priority queue and search state to be empty. """
+        self.context.clear()
+    
+    def add_cell(self, cell, priority=0):
+        """ Add a new cell or update min priority of an existing cell. """
+        self.p_queue.push(cell, priority)
+
+    def remove_cell(self, cell):
+        """ Remove an existing cell from priority queue. """
+        self.p_queue.remove(cell)
+
+    def pop_cell(self):
+        """
+        Remove and return the lowest priority cell.
+        Raise KeyError if empty.
+        """
+        return self.p_queue.pop()
+    
+    def reconstruct_path(self, current):
+        """ Return path of (row, col) cells from start to current cell. """
+        current = self.to_index(current)
+        path = [current]
+        while current in self.came_from:
+            current = self.came_from[current]
+            path.append(current)
+        return [divmod(idx, self.width) for idx in reversed(path)]
+    
+    def step_cost(self, cell, neighbor):
+        """ Return cost of the move between two adjacent cells. """
+        if cell[0] != neighbor[0] and cell[1] != neighbor[1]:
+            return self.diagonal_cost
+        return 1
+
+    def get_h_field(self, end_pos):
+        """
+        Return heuristic values of all cells for the end position.
+        The field is cached until the end position or heuristic changes.
+        Big grids (LAZY_H_CELLS) get values computed on lookup instead.
+        """
+        key = (end_pos, self.heuristic, self.weight, self.diagonal_cost)
+        if key != self.h_key:
+            if self.width * self.height >= LAZY_H_CELLS:
+                self.h_field = HeuristicCells(self.width, end_pos,
+                                              self.heuristic, self.weight,
+                                              self.diagonal_cost)
+            else:
+                field = heuristic_field(self.width, self.height, end_pos,
+                                        self.heuristic, self.weight,
+                                        self.diagonal_cost)
+                # memoryview lookups return plain floats and beat
+                # numpy indexing
+                self.h_field = memoryview(field.reshape(-1))
+            self.h_key = key
+        return self.h_field
+
+    def init_search(self, start_pos):
+        """ Put start position into empty priority queue with zero cost. """
+        self.is_over = False
+        start = self.to_index(start_pos)
+        self.g_score[start] = 0
+        self.add_cell(start)
+
+    def a_star_search_iter(self, start_pos, end_pos):
+        """
+        Execute one iteration of the algorithm: expand the cell with
+        the lowest priority. Cost of the path from start position to 
+        a cell (g(x)) is kept in self.g_score and updated whenever 
+        a cheaper path to the cell is found. Heuristic function h(x) 
+        estimates cost of the cheapest path from the cell to the end 
+        position and is looked up in a precomputed heuristic field.
+        Algorithm uses min priority queue of open cells.
+        Set self.is_over when the end position is reached.
+        """
+        if self.stats is not None:
+            self.counted_iter(start_pos, end_pos)
+        elif self.p_queue:
+            cur_cell = self.pop_cell()
+            if cur_cell == self.to_index(end_pos):
+                self.is_over = True
+                return
+            self.closed.add(cur_cell)
+            self.expand(cur_cell, end_pos)
+
+    def counted_iter(self, start_pos, end_pos):
+        """ Execute a_star_search_iter and add its work to self.stats. """
+        queue = self.p_queue
+        if not queue:
+            return
+        stale_pops = queue.stale_pops
+        cur_cell = self.pop_cell()
+        self.stats.stale_pops += queue.stale_pops - stale_pops
+        if cur_cell == self.to_index(end_pos):
+            self.is_over = True
+            return
+        self.closed.add(cur_cell)
+        self.count_expand(cur_cell, queue, self.g_score, self.expand,
+                          cur_cell, end_pos)
+
+    def count_expand(self, cur_cell, queue, g_score, expand, *args):
+        """
+        Call expand(*args) that expands the cell cur_cell with costs
+        in g_score into the queue, add its work to self.stats and call
+        the tracer. Pushes are counted by the queue; pushes of cells
+        that already had a cost decrease their keys.
+        """
+        stats = self.stats
+        stats.expansions += 1
+        stats.neighbor_checks += self.neighbor_checks(cur_cell)
+        if stats.tracer is not None:
+            stats.tracer(self.to_cell(cur_cell), g_score[cur_cell])
+        count, known = queue.count, len(g_score)
+        expand(*args)
+        pushes = queue.count - count
+        stats.pushes += pushes
+        stats.decreased += pushes - (len(g_score) - known)
+
+    def neighbor_checks(self, cur_cell):
+        """ Return number of neighbors examined by expanding the cell. """
+        return len(self.move_table[self.border_key(cur_cell)])
+
+    def expand(self, cur_cell, end_pos):
+        """ Relax all neighbors of the cell with flat index cur_cell. """
+        cur_g = self.g_score[cur_cell]
+        h_field = self.get_h_field(end_pos)
+        flat = self.flat
+        mark = self.mark_cells
+        closed = self.closed
+        g_score = self.g_score
+        push = self.p_queue.push
+        for offset, step in self.move_table[self.border_key(cur_cell)]:
+            neighbor = cur_cell + offset
+            if neighbor in closed or flat[neighbor] == FULL:
+                continue
+            g_x = cur_g + step
+            if g_x < g_score.get(neighbor, INF):
+                g_score[neighbor] = g_x
+                self.came_from[neighbor] = cur_cell
+                push(neighbor, g_x + h_field[neighbor])
+                if mark:
+                    self.mark_search(neighbor)
+    
+    def a_star_search(self, start_pos, end_pos):
+        """
+        The algorithm minimizes the sum of cost of the path 
+        from start position to current position (g(x)) and 
+        heuristic function h(x) that estimates cost of the cheapest 
+        path from current to the end position (self.heuristic).
+        Return a list of grid cells forming a path from start to end
+        (empty if there is no path) and mark it on the grid.
+        Raise IndexError if start or end is outside the grid.
+        Paths are taken from self.path_cache if there is one; parts
+        of cached paths are reused as well if the paths are optimal.
+        Ends in different components (self.components) get no path
+        without any search.
+        """
+        self.check_cell(start_pos)
+        self.check_cell(end_pos)
+        start_pos, end_pos = tuple(start_pos), tuple(end_pos)
+        if (self.components is not None
+                and not self.components.connected(start_pos, end_pos)):
+            return []
+        stats = self.stats
+        if stats is not None:
+            stats.searches += 1
+            stats.start()
+        cache = self.path_cache
+        params = (self.heuristic, self.weight, self.diagonal_cost)
+        subpaths = cache is not None and self.optimal_paths()
+        if cache is not None:
+            path = cache.get(self.version, start_pos, end_pos, params,
+                             subpaths)
+            if path is not None:
+                self.mark_path(path)
+                if stats is not None:
+                    stats.lap('path')
+                return path
+
+        if self.use_kernel():
+            self.clear_p_queue()
+            path = [divmod(idx, self.width) for idx in self.kernel.search(
+                self.to_index(start_pos), self.to_index(end_pos),
+                self.heuristic, self.weight, self.diagonal_cost)]
+            self.is_over = bool(path)
+            self.mark_path(path)
+        else:
+            self.clear_p_queue()
+            self.init_search(start_pos)
+            if stats is not None:
+                self.get_h_field(end_pos)
+                stats.lap('setup')
+
+            while self.p_queue and not self.is_over:
+                self.a_star_search_iter(start_pos, end_pos)
+            if stats is not None:
+                stats.lap('search')
+
+            path = self.reconstruct_path(end_pos) if self.is_over else []
+            self.mark_path(path)
+        if cache is not None:
+            # Marked PATH cells changed the version, store under the new one.
+            cache.put(self.version, start_pos, end_pos, params, path,
+                      subpaths)
+        if stats is not None:
+            stats.lap('path')
+        return path
+
+    def use_kernel(self):
+        """
+        Check whether a_star_search may run in the compiled kernel:
+        there is one, the search is plain A* (not changed by a subclass),
+        nothing is marked or counted.
+        """
+        cls = type(self)
+        return (self.kernel is not None and not self.mark_cells
+                and self.stats is None
+                and cls.a_star_search_iter is Astar.a_star_search_iter
+                and cls.expand is Astar.expand
+                and cls.get_h_field is Astar.get_h_field)
+
+    def optimal_paths(self):
+        """ Check whether a_star_search finds only optimal paths. """
+        return self.weight <= 1 and is_admissible(self.heuristic,
+                                                  self.diagonal_cost)
+
+    def mark_path(self, path):
+        """ Mark cells of the path between its ends as PATH cells. """
+        if self.mark_cells:
+            for cell in path[1:-1]:
+                self.set_value(cell[0], cell[1], PATH)
+
+
+def grid_from_text(lines):
+    """
+    Return Grid built from lines of characters, one line per row.
+    Characters from BLOCKED_CHARS are obstacles, others are empty.
+    Header of Moving AI '.map' files (up to the 'map' line) is skipped.
+    """
+    lines = [line.rstrip('\r\n') for line in lines]
+    if lines and lines[0].startswith('type'):
+        lines = lines[lines.index('map') + 1:]
+    lines = [line for line in lines if line]
+    height = len(lines)
+    width = max(len(line) for line in lines) if lines else 0
+
+    grid = Grid(width, height)
+    text = ''.join(line.ljust(width) for line in lines).encode('latin-1')
+    chars = np.frombuffer(text, dtype=np.uint8).reshape(height, width)
+    blocked = np.frombuffer(BLOCKED_CHARS.encode('latin-1'), dtype=np.uint8)
+    grid.cells[np.isin(chars, blocked)] = FULL
+    return grid
+
+
+def find_path(grid, start, end, **options):
+    """
+    Return a list of (row, col) cells forming a path from start to end
+    on the grid (empty if there is no path). Grid cells stay unchanged.
+    Options are passed to Astar: diagonal_cost, heuristic, weight.
+    Paths are optimal unless a heuristic or weight is given that
+    overestimates (see a_star_heuristics.is_admissible).
+    """
+    solver = Astar(grid.width, grid.height, cells=grid.cells,
+                   mark_cells=False, **options)
+    return solver.a_star_search(start, end)
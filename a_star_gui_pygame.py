@@ -11,8 +11,14 @@ __email__ = "andrey.yermishin@gmail.com"
 __status__ = "Production"
 
 import sys
+import time
+from collections import deque, OrderedDict
+import numpy as np
 import pygame
 
+from a_star_stats import SearchStats, COUNTERS
+from a_star_thread import SearchThread, DONE
+
 
 # Global constants
 EMPTY = 0
@@ -21,6 +27,7 @@ START = 2
 END = 3
 SEARCH = 4
 PATH = 5
+BACK_SEARCH = 6
 
 BLACK = pygame.Color('black')
 ORANGE = pygame.Color('orangered')
@@ -30,6 +37,7 @@ BLUE = pygame.Color('blue')
 PURPLE = pygame.Color('purple')
 # PURPLE4 = pygame.Color(85, 26, 139)
 DARK_BLUE = pygame.Color('darkslateblue')
+TEAL = pygame.Color('darkcyan')
 GRAY = pygame.Color('gray')
 LIGHT_GRAY = pygame.Color('lightgray')
 
@@ -38,27 +46,38 @@ CELL_COLORS = {EMPTY: BLACK,
                START: ORANGE,
                END: GREEN,
                SEARCH: PURPLE,
-               PATH: BLUE}
+               PATH: BLUE,
+               BACK_SEARCH: TEAL}
 
 ADD_MAP = {FULL: 0, START: 1, END: 2}
 
 # GUI constants
 CELL_SIZE = 30
 WIDTH0 = 260    # for controls in Pygame
+PANEL_HEIGHT = 700   # lowest height of the window to fit the controls
+STATS_TOP = 550 # search counters are shown below the buttons
+STATS_LINE = 22
+MAX_DIRTY_CELLS = 2000  # more changed cells in a frame redraw all grid
+MAX_PANELS = 8  # panel surfaces kept for recent states (hovering etc.)
+
+# RGB colors of cell values for bulk drawing: COLOR_LUT[cells]
+COLOR_LUT = np.zeros((256, 3), dtype=np.uint8)
+for value, color in CELL_COLORS.items():
+    COLOR_LUT[value] = tuple(color)[:3]
 
-# for timer
-TIMER_STOP = 0
-timer_play_sim = pygame.USEREVENT + 1
-TIMER_DELAY = 100   # 0.1s
+# Simulation speed: search steps (expansions or PATH cells) per frame,
+# None for as many as fit in FRAME_BUDGET.
+SPEEDS = (1, 3, 10, 30, 100, 300, 1000, 3000, 10000, None)
+FPS = 30
+FRAME_BUDGET = 20   # ms of a frame for simulation steps at most
 
 
 # Button with hovering:
-def button(text, surface, location, color_act, color_idle, mouse_pos):
+def button(text, surface, location, color_act, color_idle, mouse_pos, font):
     color = color_act if location.collidepoint(mouse_pos) else color_idle
     pygame.draw.rect(surface, color, location)
 
     # text over button with centering
-    font = pygame.font.SysFont('arial', 20, bold=True)
     text_surface = font.render(text, True, BLACK)
     text_rect = text_surface.get_rect()
     text_rect.center = location.center
@@ -70,16 +89,31 @@ class AstarGUI:
     GUI class for A* path search algorithm.
     """
 
-    def __init__(self, simulation):
-        """ Create a frame. """
+    def __init__(self, simulation, cell_size=CELL_SIZE, bulk=False,
+                 threaded=False):
+        """
+        Create a frame with square cells of cell_size pixels.
+        In bulk mode all cells are drawn at once as an image scaled
+        to cell_size (no grid lines, cells are filled solid), which
+        suits big grids and cell_size down to 1 pixel.
+        Threaded simulation runs at full speed in a SearchThread and
+        the GUI shows cells it changed every frame.
+        Counters of search work (simulation.stats) are shown under
+        the buttons.
+        """
         self.simulation = simulation
         self.grid_w = simulation.get_grid_width()
         self.grid_h = simulation.get_grid_height()
+        self.cell_size = cell_size
+        self.bulk = bulk
+        self.threaded = threaded
+        self.worker = None  # SearchThread of a running threaded simulation
 
         # Set up window
         pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH0 + self.grid_w*CELL_SIZE,
-                                               self.grid_h*CELL_SIZE))
+        self.screen = pygame.display.set_mode(
+            (WIDTH0 + self.grid_w*cell_size,
+             max(self.grid_h*cell_size, PANEL_HEIGHT)))
         pygame.display.set_caption('A* path search algorithm simulation'
                                    + ' (by Andrei Ermishin)')
 
@@ -98,11 +132,35 @@ class AstarGUI:
         self.btn_end = pygame.Rect(50, 160, WIDTH0-100, 40)
         self.btn_clear = pygame.Rect(80, 250, WIDTH0-160, 40)
 
+        self.btn_slower = pygame.Rect(50, 305, 40, 40)
+        self.btn_faster = pygame.Rect(WIDTH0-90, 305, 40, 40)
+        self.btn_finish = pygame.Rect(80, 360, WIDTH0-160, 40)
         self.btn_play_sim = pygame.Rect(50, 420, WIDTH0-100, 40)
         self.btn_clear_search = pygame.Rect(80, 490, WIDTH0-160, 40)
+        self.buttons = (self.btn_obst, self.btn_start, self.btn_end,
+                        self.btn_clear, self.btn_slower, self.btn_faster,
+                        self.btn_finish, self.btn_play_sim,
+                        self.btn_clear_search)
         
         self.sim_running = False
-        self.path = []
+        self.speed_idx = 0  # index of steps per frame in SPEEDS
+        self.path = deque() # PATH cells left to show
+
+        # Static layers are drawn once; cells changed through the grid
+        # (set_value, mark_search, clear...) are redrawn every frame.
+        self.font = pygame.font.SysFont('arial', 20, bold=True)
+        self.stats_font = pygame.font.SysFont('arial', 16)
+        self.background = self.draw_background()
+        self.image = pygame.Surface((self.grid_w, self.grid_h)) # bulk mode
+        # Panel surfaces by panel_state(), least recently drawn first.
+        self.panels = OrderedDict()
+        self.drawn_panel = None
+        self.redraw_grid = True
+        self.dirty = set()  # cells to redraw, changed by simulation or worker
+        simulation.dirty = self.dirty
+        if simulation.stats is None:
+            simulation.stats = SearchStats()
+        self.drawn_counters = None
 
     def start(self):
         """ Start the GUI. """
@@ -118,7 +176,7 @@ class AstarGUI:
                 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = event.pos
-                    if mouse_pos[0] > WIDTH0:
+                    if self.in_grid(mouse_pos):
                         if self.item_type == FULL:
                             self.drag_started = True
                             self.drag_points.add(self.pos_to_index(mouse_pos))
@@ -136,98 +194,193 @@ class AstarGUI:
                             self.clear()
                         elif self.btn_clear_search.collidepoint(mouse_pos):
                             self.clear_search()
+                        elif self.btn_slower.collidepoint(mouse_pos):
+                            self.set_speed(self.speed_idx - 1)
+                        elif self.btn_faster.collidepoint(mouse_pos):
+                            self.set_speed(self.speed_idx + 1)
+                        elif self.btn_finish.collidepoint(mouse_pos):
+                            self.finish()
                         elif self.btn_play_sim.collidepoint(mouse_pos):
                             # Redraw screen until stop pressed or finish.
                             # self.start() - will be Stop when pressed
                             self.search_simulation()
                 
                 if event.type == pygame.MOUSEMOTION and self.drag_started:
-                    if event.pos[0] > WIDTH0:
+                    if self.in_grid(event.pos):
                         self.drag_points.add(self.pos_to_index(event.pos))
                 
                 if event.type == pygame.MOUSEBUTTONUP and self.drag_started:
                     self.drag_started = False
                     self.add_obstacles()
-                
-                if self.sim_running and event.type == timer_play_sim:
-                    self.play_sim()
             
-            self.draw(self.screen)
-            pygame.display.flip()
+            if self.worker is not None:
+                self.receive()
+            elif self.sim_running:
+                self.advance()
+            pygame.display.update(self.draw(self.screen))
 
             # It micro pauses the while loop to run 30 times a second max.
-            clock.tick(30)
+            clock.tick(FPS)
         
-        pygame.time.set_timer(timer_play_sim, TIMER_STOP)
+        self.stop_worker()
         pygame.quit()
         sys.exit()
 
     def clear(self):
         """ Event handler for button that clears everything. """
+        self.stop_worker()
         self.simulation.clear()
+        self.simulation.stats.reset()
 
         self.drag_points.clear()
         self.start_pos = ()
         self.end_pos = ()
         self.sim_running = False
-        self.path = []
+        self.path = deque()
 
     def clear_search(self):
         """ Clear grid cells containing SEARCH or PATH values. """
         if self.start_pos and self.end_pos:
+            self.stop_worker()
             self.sim_running = False
-            self.path = []
+            self.path = deque()
             self.simulation.clear_p_queue()
-            self.simulation.clear_from(SEARCH)
-            self.simulation.clear_from(PATH)
+            self.simulation.clear_marks()
     
     def search_simulation(self):
         """ Start iterative simulation of A* search. """
         # Start simulation:
         if not self.sim_running and self.start_pos and self.end_pos:
             self.clear_search()
-            self.simulation.is_over = False
-            self.simulation.add_cell(self.start_pos)
-            pygame.time.set_timer(timer_play_sim, TIMER_DELAY)
+            self.simulation.stats.reset()
+            if self.threaded:
+                self.worker = SearchThread(self.simulation,
+                                           self.start_pos, self.end_pos)
+                self.worker.start()
+            else:
+                self.simulation.init_search(self.start_pos)
             self.sim_running = True
         # Stop:
         elif self.sim_running:
+            self.stop_worker()
             self.sim_running = False
-            pygame.time.set_timer(timer_play_sim, TIMER_STOP)
     
     def play_sim(self):
-        """ Execute one iteration of A* search algorithm and fill the grid. """
-        if not self.simulation.is_over:
-            self.simulation.a_star_search_iter(self.start_pos, self.end_pos)
-        else:
-            if not self.path:
-                self.path = self.simulation.reconstruct_path(self.end_pos)[1:-1]
-            row, col = self.path.pop(0)
-            self.simulation.set_value(row, col, PATH)
+        """
+        Execute one iteration of A* search algorithm or show one cell
+        of the found path. Stop simulation when it is over.
+        """
+        simulation = self.simulation
+        if not simulation.is_over:
+            # Search may finish on a call with no open cells (LPA*).
+            exhausted = not simulation.p_queue
+            simulation.a_star_search_iter(self.start_pos, self.end_pos)
+            if simulation.is_over:
+                self.path = deque(
+                    simulation.reconstruct_path(self.end_pos)[1:-1])
+            elif exhausted:
+                self.sim_running = False    # there is no path
+                return
+        elif self.path:
+            row, col = self.path.popleft()
+            simulation.set_value(row, col, PATH)
+        if simulation.is_over and not self.path:
+            self.sim_running = False
 
-            if len(self.path) == 0:
+    def advance(self):
+        """
+        Execute simulation steps of one frame: SPEEDS[self.speed_idx]
+        of them, but not longer than FRAME_BUDGET ms.
+        """
+        steps = SPEEDS[self.speed_idx]
+        deadline = time.perf_counter() + FRAME_BUDGET / 1000
+        count = 0
+        while self.sim_running and count != steps:
+            self.play_sim()
+            count += 1
+            # Clock is checked once in a while, steps are much faster.
+            if count % 16 == 0 and time.perf_counter() > deadline:
+                break
+
+    def receive(self, block=False):
+        """
+        Take cells changed by the worker thread for redrawing, for
+        FRAME_BUDGET ms at most (or until the end of search if block).
+        """
+        deadline = time.perf_counter() + FRAME_BUDGET / 1000
+        while block or time.perf_counter() < deadline:
+            events = self.worker.get_events(block)
+            if events is DONE:
+                self.worker.join()
+                self.worker = None
                 self.sim_running = False
-                pygame.time.set_timer(timer_play_sim, TIMER_STOP)
-                    
+                return
+            if not events:
+                return
+            self.dirty.update(idx for idx, _value in events)
+
+    def stop_worker(self):
+        """ Cancel the worker thread and wait for it to end. """
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.join()
+            self.worker = None
+            self.sim_running = False
+            # Cells changed by the worker but not received yet.
+            self.redraw_grid = True
+
+    def finish(self):
+        """ Event handler to run simulation to the end at once. """
+        if not self.sim_running:
+            self.search_simulation()
+        if self.worker is not None:
+            self.receive(block=True)
+        while self.sim_running:
+            self.play_sim()
+
+    def set_speed(self, speed_idx):
+        """ Set index of simulation steps per frame in SPEEDS. """
+        self.speed_idx = min(max(speed_idx, 0), len(SPEEDS) - 1)
 
     def set_type(self, item_type):
         """ Set type of item to obstacles, start or end point. """
         self.item_type = item_type
         self.item_rect_idx = ADD_MAP[item_type]
 
+    def in_grid(self, position):
+        """ Check whether coordinates are over a cell of the grid. """
+        return (WIDTH0 <= position[0] < WIDTH0 + self.grid_w*self.cell_size
+                and 0 <= position[1] < self.grid_h*self.cell_size)
+
     def pos_to_index(self, position):
         """ Return (row, col) converted from coordinates. """
         new_pos = (position[0] - WIDTH0, position[1])
-        return self.simulation.get_index(new_pos, CELL_SIZE)
+        return self.simulation.get_index(new_pos, self.cell_size)
     
     def add_obstacles(self):
         """ Event handler to add new obstacles. """
+        self.stop_worker()
         for row, col in self.drag_points:
-            if self.simulation.is_empty(row, col):
+            if self.simulation.cells[row, col] in (EMPTY, SEARCH, PATH,
+                                                   BACK_SEARCH):
                 self.simulation.set_value(row, col, FULL)
+        self.replan()
+    
+    def replan(self):
+        """
+        Repair finished search of incremental simulation after
+        obstacles change and show the new path at once.
+        """
+        if (hasattr(self.simulation, 'replan') and self.simulation.is_over
+                and not self.sim_running):
+            path = self.simulation.replan()
+            self.simulation.clear_from(PATH)
+            for row, col in path[1:-1]:
+                self.simulation.set_value(row, col, PATH)
     
     def add_item(self, click_position):
         """ Event handler to add new start and end points. """
+        self.stop_worker()
         row, col = self.pos_to_index(click_position)
         if self.simulation.is_empty(row, col):
             if self.item_type == START:
@@ -243,70 +396,194 @@ class AstarGUI:
                 self.end_pos = (row, col)
                 self.simulation.set_value(row, col, END)
 
-    def draw_grid(self, surface):
-        """ Draw entire grid. """
+    def draw_background(self):
+        """ Return surface of the empty grid with lines. """
+        size = self.cell_size
+        width, height = self.grid_w * size, self.grid_h * size
+        background = pygame.Surface((width, height))
+        background.fill(BLACK)
         # Boundary
-        pygame.draw.rect(surface, DARK_BLUE,
-                         [WIDTH0, 0,
-                          self.grid_w * CELL_SIZE, self.grid_h * CELL_SIZE],
-                         1)
+        pygame.draw.rect(background, DARK_BLUE, [0, 0, width, height], 1)
         # Inner lines:
         for row in range(1, self.grid_h):
-            for col in range(1, self.grid_w):
-                # horizontal line
-                pygame.draw.line(surface, DARK_BLUE, (WIDTH0, row*CELL_SIZE),
-                                 (WIDTH0+self.grid_w*CELL_SIZE, row*CELL_SIZE),
-                                 1)
-                # vertical line
-                pygame.draw.line(surface, DARK_BLUE, (WIDTH0+col*CELL_SIZE, 0),
-                                 (WIDTH0+col*CELL_SIZE, self.grid_h*CELL_SIZE),
-                                 1)
-        
-        for (row, col), value in self.simulation.get_idx_value_pairs():
-            if value != EMPTY:
-                margin = CELL_SIZE // 3 if value == SEARCH else 0
-                margin = CELL_SIZE // 10 if value == PATH else margin
-                pygame.draw.rect(surface, CELL_COLORS[value],
-                                 [WIDTH0 + col*CELL_SIZE + margin,
-                                  row*CELL_SIZE + margin,
-                                  CELL_SIZE - 2*margin, CELL_SIZE - 2*margin])
+            pygame.draw.line(background, DARK_BLUE, (0, row*size),
+                             (width, row*size), 1)
+        for col in range(1, self.grid_w):
+            pygame.draw.line(background, DARK_BLUE, (col*size, 0),
+                             (col*size, height), 1)
+        return background
+
+    def draw_cell(self, surface, row, col, value):
+        """ Draw one cell over the grid background, return its rect. """
+        size = self.cell_size
+        rect = pygame.Rect(WIDTH0 + col*size, row*size, size, size)
+        surface.blit(self.background, rect, rect.move(-WIDTH0, 0))
+        if value != EMPTY:
+            margin = size // 3 if value in (SEARCH, BACK_SEARCH) else 0
+            margin = size // 10 if value == PATH else margin
+            pygame.draw.rect(surface, CELL_COLORS[value],
+                             rect.inflate(-2*margin, -2*margin))
+        return rect
 
-    def draw(self, surface):
+    def draw_grid(self, surface):
+        """ Draw entire grid, return its rect. """
+        if self.bulk:
+            return self.draw_bulk(surface)
+        surface.blit(self.background, (WIDTH0, 0))
+        cells = self.simulation.cells
+        for row, col in zip(*np.nonzero(cells)):
+            self.draw_cell(surface, row, col, cells[row, col])
+        return self.background.get_rect(topleft=(WIDTH0, 0))
+
+    def draw_bulk(self, surface, dirty=None):
         """
-        Handler for drawing the grid and buttons.
+        Draw cells as one image scaled to cell size, return its rect.
+        Only the flat indices from dirty are updated in the image and
+        only the rect bounding them is drawn, if dirty is given.
         """
-        surface.fill(BLACK)
+        cells = self.simulation.cells
+        if dirty is None:
+            area = self.image.get_rect()
+            # surfarray is indexed by (x, y), i.e. columns first.
+            pygame.surfarray.blit_array(self.image, COLOR_LUT[cells.T])
+        else:
+            idx = np.fromiter(dirty, dtype=np.intp, count=len(dirty))
+            rows, cols = np.divmod(idx, self.grid_w)
+            pixels = pygame.surfarray.pixels3d(self.image)
+            pixels[cols, rows] = COLOR_LUT[cells.reshape(-1)[idx]]
+            del pixels  # unlocks the image
+            area = pygame.Rect(int(cols.min()), int(rows.min()),
+                               int(cols.max() - cols.min()) + 1,
+                               int(rows.max() - rows.min()) + 1)
+        size = self.cell_size
+        rect = pygame.Rect(WIDTH0 + area.x*size, area.y*size,
+                           area.w*size, area.h*size)
+        if size == 1:
+            surface.blit(self.image, rect, area)
+        else:
+            pygame.transform.scale(self.image.subsurface(area), rect.size,
+                                   surface.subsurface(rect))
+        return rect
 
+    def panel_state(self):
+        """ Return tuple of everything the panel of controls depends on. """
         mouse_pos = pygame.mouse.get_pos()
+        hovered = None
+        for idx, location in enumerate(self.buttons):
+            if location.collidepoint(mouse_pos):
+                hovered = idx
+        return (hovered, self.item_rect_idx, self.sim_running,
+                bool(self.start_pos and self.end_pos), self.speed_idx)
+
+    def draw_panel(self, state):
+        """ Return surface with buttons drawn for the panel state. """
+        hovered, item_rect_idx, sim_running, ready, speed_idx = state
+        surface = pygame.Surface((WIDTH0, max(self.grid_h * self.cell_size,
+                                              PANEL_HEIGHT)))
+        surface.fill(BLACK)
+        # Hovered button is found already, pass a point inside it.
+        mouse_pos = (self.buttons[hovered].center if hovered is not None
+                     else (-1, -1))
+        font = self.font
 
         # Draw buttons
         button('Add:   obstacles', surface, self.btn_obst,
-               LIGHT_GRAY, GRAY, mouse_pos)
+               LIGHT_GRAY, GRAY, mouse_pos, font)
         button('Add:     start -->', surface, self.btn_start,
-               LIGHT_GRAY, GRAY, mouse_pos)
+               LIGHT_GRAY, GRAY, mouse_pos, font)
         button('Add:     --> end', surface, self.btn_end,
-               LIGHT_GRAY, GRAY, mouse_pos)
+               LIGHT_GRAY, GRAY, mouse_pos, font)
         button('Clear all', surface, self.btn_clear,
-               IND_RED, GRAY, mouse_pos)
+               IND_RED, GRAY, mouse_pos, font)
         button('Clear search', surface, self.btn_clear_search,
-               IND_RED, GRAY, mouse_pos)
+               IND_RED, GRAY, mouse_pos, font)
+        button('-', surface, self.btn_slower,
+               LIGHT_GRAY, GRAY, mouse_pos, font)
+        button('+', surface, self.btn_faster,
+               LIGHT_GRAY, GRAY, mouse_pos, font)
+        button('Finish', surface, self.btn_finish,
+               GREEN if ready else LIGHT_GRAY, GRAY, mouse_pos, font)
+        # Speed between - and + buttons.
+        steps = SPEEDS[speed_idx]
+        text = font.render('{} / frame'.format(steps) if steps else 'max',
+                           True, LIGHT_GRAY)
+        surface.blit(text, text.get_rect(
+            center=((self.btn_slower.right + self.btn_faster.left) // 2,
+                    self.btn_slower.centery)))
         
-        if not self.sim_running:
+        if not sim_running:
             button('Simulation', surface, self.btn_play_sim,
-                GREEN if self.start_pos and self.end_pos else LIGHT_GRAY,
-                GRAY, mouse_pos)
+                   GREEN if ready else LIGHT_GRAY, GRAY, mouse_pos, font)
         else:
             button('<Stop>', surface, self.btn_play_sim,
-                   IND_RED, GRAY, mouse_pos)
+                   IND_RED, GRAY, mouse_pos, font)
         
         # Draw toggle item's rect.
         pygame.draw.rect(surface, PURPLE,
-                         [45, 35 + self.item_rect_idx*60, WIDTH0 - 90, 50], 2)
-        
-        self.draw_grid(surface)
+                         [45, 35 + item_rect_idx*60, WIDTH0 - 90, 50], 2)
+        return surface
+
+    def draw_stats(self, surface, counters):
+        """ Draw search counters under the buttons and return the rect. """
+        rect = pygame.Rect(0, STATS_TOP, WIDTH0,
+                           STATS_LINE * (len(COUNTERS) - 1))
+        surface.fill(BLACK, rect)
+        # Searches are not counted by stepping simulation.
+        for line, (name, value) in enumerate(zip(COUNTERS[1:],
+                                                 counters[1:])):
+            text = self.stats_font.render(
+                '{}: {}'.format(name.replace('_', ' '), value),
+                True, LIGHT_GRAY)
+            surface.blit(text, (50, STATS_TOP + line * STATS_LINE))
+        return rect
 
-
-def run(sim):
+    def draw(self, surface):
+        """
+        Handler for drawing the grid and buttons. Only the panel (if its
+        state changed), changed counters and changed cells are drawn.
+        Return list of rects of the surface to update on the screen.
+        """
+        rects = []
+        state = self.panel_state()
+        counters = self.simulation.stats.counters()
+        if state != self.drawn_panel or self.redraw_grid:
+            if state in self.panels:
+                self.panels.move_to_end(state)
+            else:
+                self.panels[state] = self.draw_panel(state)
+                if len(self.panels) > MAX_PANELS:
+                    self.panels.popitem(last=False)
+            rects.append(surface.blit(self.panels[state], (0, 0)))
+            self.drawn_panel = state
+            self.drawn_counters = None  # the panel covers them
+        if counters != self.drawn_counters:
+            rects.append(self.draw_stats(surface, counters))
+            self.drawn_counters = counters
+
+        dirty = self.dirty
+        if self.bulk:
+            # Cells are redrawn within a rect bounding the changed ones.
+            if self.redraw_grid:
+                rects.append(self.draw_grid(surface))
+                self.redraw_grid = False
+            elif dirty:
+                rects.append(self.draw_bulk(surface, dirty))
+            dirty.clear()
+            return rects
+        if self.redraw_grid or len(dirty) > MAX_DIRTY_CELLS:
+            self.draw_grid(surface)
+            self.redraw_grid = False
+            dirty.clear()
+            return [surface.get_rect()]
+        flat = self.simulation.flat
+        for idx in dirty:
+            row, col = divmod(idx, self.grid_w)
+            rects.append(self.draw_cell(surface, row, col, flat[idx]))
+        dirty.clear()
+        return rects
+
+
+def run(sim, cell_size=CELL_SIZE, bulk=False, threaded=False):
     """ Start interactive simulation. """
-    gui = AstarGUI(sim)
+    gui = AstarGUI(sim, cell_size, bulk, threaded)
     gui.start()
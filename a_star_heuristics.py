@@ -0,0 +1,156 @@
+""" Heuristic functions for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import numpy as np
+
+
+# Every heuristic takes absolute row and column distances to the end
+# position (numbers or numpy arrays) and the cost of a diagonal move.
+
+def euclidean(d_row, d_col, diagonal_cost=1):
+    """ Straight-line distance. """
+    return np.hypot(d_row, d_col)
+
+
+def octile(d_row, d_col, diagonal_cost=math.sqrt(2)):
+    """ Exact distance on an empty 8-connected grid. """
+    return (np.maximum(d_row, d_col)
+            + (diagonal_cost - 1) * np.minimum(d_row, d_col))
+
+
+def manhattan(d_row, d_col, diagonal_cost=1):
+    """ Exact distance on an empty 4-connected grid. """
+    return d_row + d_col
+
+
+def chebyshev(d_row, d_col, diagonal_cost=1):
+    """ Exact distance on an empty 8-connected grid with unit moves. """
+    return np.maximum(d_row, d_col)
+
+
+HEURISTICS = {'euclidean': euclidean,
+              'octile': octile,
+              'manhattan': manhattan,
+              'chebyshev': chebyshev}
+
+# The same heuristics for plain numbers, numpy is slow on scalars.
+CELL_HEURISTICS = {
+    'euclidean': lambda d_row, d_col, diagonal_cost: math.hypot(d_row,
+                                                                d_col),
+    'octile': lambda d_row, d_col, diagonal_cost: (
+        max(d_row, d_col) + (diagonal_cost - 1) * min(d_row, d_col)),
+    'manhattan': lambda d_row, d_col, diagonal_cost: d_row + d_col,
+    'chebyshev': lambda d_row, d_col, diagonal_cost: max(d_row, d_col)}
+
+
+def is_admissible(heuristic, diagonal_cost=1):
+    """
+    Check whether the heuristic never overestimates cost of a path
+    on an 8-connected grid with the diagonal cost, so that A* finds
+    optimal paths with it.
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError('Unknown heuristic: {}.'.format(heuristic))
+    if heuristic == 'euclidean':
+        return diagonal_cost >= math.sqrt(2)
+    if heuristic == 'octile':
+        return diagonal_cost <= 2  # else two straight moves are cheaper
+    if heuristic == 'manhattan':
+        return diagonal_cost >= 2
+    return diagonal_cost >= 1
+
+
+def default_heuristic(diagonal_cost=1):
+    """
+    Return name of the heuristic for the diagonal cost that keeps
+    paths optimal: octile (exact on an empty grid) unless diagonal
+    moves cost more than two straight ones, manhattan then.
+    """
+    return 'octile' if diagonal_cost <= 2 else 'manhattan'
+
+
+def heuristic_field(width, height, end_pos, heuristic='euclidean',
+                    weight=1, diagonal_cost=1):
+    """
+    Return 2D float array of heuristic values of all grid cells
+    for the end position, computed at once.
+    Weight greater than 1 turns search into weighted A*.
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError('Unknown heuristic: {}.'.format(heuristic))
+    # Column of row distances and row of column distances broadcast
+    # to the whole grid.
+    d_row = np.abs(np.arange(height, dtype=float) - end_pos[0])[:, None]
+    d_col = np.abs(np.arange(width, dtype=float) - end_pos[1])[None, :]
+    field = HEURISTICS[heuristic](d_row, d_col, diagonal_cost)
+    field = np.broadcast_to(field, (height, width)).astype(float)
+    if weight != 1:
+        field *= weight
+    return field
+
+
+class HeuristicCells(dict):
+    """
+    Heuristic values of grid cells for the end position looked up
+    by flat index like a flat heuristic_field, but computed on first
+    lookup of every cell and kept: a search touching few cells of
+    a big grid does not pay for the whole field.
+    """
+
+    def __init__(self, width, end_pos, heuristic='euclidean', weight=1,
+                 diagonal_cost=1):
+        """ Create empty values for a grid of given width. """
+        dict.__init__(self)
+        if heuristic not in HEURISTICS:
+            raise ValueError('Unknown heuristic: {}.'.format(heuristic))
+        self.width = width
+        self.end_pos = end_pos
+        self.function = CELL_HEURISTICS[heuristic]
+        self.weight = weight
+        self.diagonal_cost = diagonal_cost
+
+    def __missing__(self, idx):
+        row, col = divmod(idx, self.width)
+        value = float(self.function(abs(row - self.end_pos[0]),
+                                    abs(col - self.end_pos[1]),
+                                    self.diagonal_cost))
+        if self.weight != 1:
+            value *= self.weight
+        self[idx] = value
+        return value
+
+
+class NearestHeuristicCells(HeuristicCells):
+    """
+    Heuristic values like HeuristicCells, but the lowest one to any
+    of several end positions, computed on first lookup of every cell.
+    """
+
+    def __init__(self, width, ends, heuristic='euclidean', weight=1,
+                 diagonal_cost=1):
+        """ Create empty values for a grid of given width. """
+        HeuristicCells.__init__(self, width, ends[0], heuristic, weight,
+                                diagonal_cost)
+        self.ends = tuple(ends)
+
+    def __missing__(self, idx):
+        row, col = divmod(idx, self.width)
+        function, diagonal_cost = self.function, self.diagonal_cost
+        value = float(min(function(abs(row - end_row), abs(col - end_col),
+                                   diagonal_cost)
+                          for end_row, end_col in self.ends))
+        if self.weight != 1:
+            value *= self.weight
+        self[idx] = value
+        return value
@@ -0,0 +1,373 @@
+""" Hierarchical path search (HPA*) for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import heapq
+import math
+
+from a_star_engine import Astar, EIGHT_MOVES, FULL, INF
+
+
+WIDE_ENTRANCE = 6   # entrances this long get two transitions, at the ends
+
+
+class HierarchicalAstar(Astar):
+    """
+    HPA*: the grid is split into square clusters. Free cells facing
+    each other across a cluster border form entrances; their cells
+    (transitions) are nodes of an abstract graph with edges across the
+    border and edges of shortest distances inside each cluster.
+    A query searches the abstract graph first and then refines every
+    abstract edge by a search inside one cluster. Paths are close to
+    optimal but not always optimal.
+    Cluster data is built on first use and cached. Changing a cell
+    with set_value drops only the cache of its cluster (and of
+    the neighbor cluster if the cell lies on their border); any change
+    of the grid version by other means drops all of it.
+    """
+
+    def __init__(self, grid_width, grid_height, obstacle_list=None,
+                 start_pos=None, end_pos=None, diagonal_cost=math.sqrt(2),
+                 heuristic=None, cluster_size=16, **options):
+        """
+        Create a simulation like Astar with diagonal cost sqrt(2)
+        and square clusters with side cluster_size.
+        """
+        self.cluster_size = cluster_size
+        self.borders = {}   # transitions of a border: list of cell pairs
+        self.clusters = {}  # abstract edges of nodes inside a cluster
+        self.cache_version = None   # grid version of cached cluster data
+        self.expansions = 0 # abstract nodes expanded by the last search
+        Astar.__init__(self, grid_width, grid_height, obstacle_list,
+                       start_pos, end_pos, diagonal_cost, heuristic,
+                       **options)
+
+    def optimal_paths(self):
+        """ Paths are close to optimal, but not always optimal. """
+        return False
+
+    def invalidate(self):
+        """ Drop all cached cluster data (after bulk edits of cells). """
+        self.borders = {}
+        self.clusters = {}
+        self.cache_version = self.version
+
+    def keep_caches(self, version):
+        """ Keep cached cluster data valid if it was for the version. """
+        if self.cache_version == version:
+            self.cache_version = self.version
+
+    def clear(self):
+        """ Clear all the grid. """
+        Astar.clear(self)
+        self.invalidate()
+
+    def clear_from(self, value):
+        """ Update cells with the value to EMPTY, drop changed data. """
+        version = self.version
+        Astar.clear_from(self, value)
+        if value == FULL:
+            self.invalidate()
+        else:
+            self.keep_caches(version)
+
+    def clear_marks(self):
+        """ Clear cells left by searches, keep cluster data. """
+        version = self.version
+        Astar.clear_marks(self)
+        self.keep_caches(version)
+
+    def set_value(self, row, col, value):
+        """ Set the cell value and drop cluster data it changes. """
+        idx = row * self.width + col
+        if (self.flat[idx] == FULL) != (value == FULL):
+            size = self.cluster_size
+            c_row, c_col = row // size, col // size
+            self.clusters.pop((c_row, c_col), None)
+            # A border depends on the cells on both of its sides.
+            for border, inside in ((('down', c_row, c_col),
+                                    row % size == size - 1),
+                                   (('down', c_row - 1, c_col),
+                                    row % size == 0),
+                                   (('right', c_row, c_col),
+                                    col % size == size - 1),
+                                   (('right', c_row, c_col - 1),
+                                    col % size == 0)):
+                if inside and self.borders.pop(border, None) is not None:
+                    self.clusters.pop(self.across(border, (c_row, c_col)),
+                                      None)
+        version = self.version
+        Astar.set_value(self, row, col, value)
+        self.keep_caches(version)
+
+    def set_values(self, cells, value):
+        """
+        Set the cells at once; all cluster data is dropped if
+        passability of any cell changes.
+        """
+        idx = self.cell_indices(cells)
+        if ((self.cells.reshape(-1)[idx] == FULL) != (value == FULL)).any():
+            self.invalidate()
+        version = self.version
+        changed = Astar.set_values(self, cells, value)
+        self.keep_caches(version)
+        return changed
+
+    def across(self, border, cluster):
+        """ Return the cluster on the other side of the border. """
+        side, c_row, c_col = border
+        if (c_row, c_col) != cluster:
+            return (c_row, c_col)
+        return (c_row + 1, c_col) if side == 'down' else (c_row, c_col + 1)
+
+    def cluster_of(self, idx):
+        """ Return (row, col) of the cluster containing the cell idx. """
+        row, col = divmod(idx, self.width)
+        return (row // self.cluster_size, col // self.cluster_size)
+
+    def cluster_bounds(self, cluster):
+        """ Return (row0, row1, col0, col1) cell bounds of the cluster. """
+        size = self.cluster_size
+        row0, col0 = cluster[0] * size, cluster[1] * size
+        return (row0, min(row0 + size, self.height),
+                col0, min(col0 + size, self.width))
+
+    def transitions(self, border):
+        """
+        Return list of (cell, cell) flat index pairs facing each other
+        across the border: one pair in the middle of every entrance,
+        or two pairs at its ends if it is WIDE_ENTRANCE or longer.
+        """
+        if border in self.borders:
+            return self.borders[border]
+        side, c_row, c_col = border
+        row0, row1, col0, col1 = self.cluster_bounds((c_row, c_col))
+        if side == 'down':
+            # pairs (row1 - 1, col) and (row1, col) along the border
+            cells = [((row1 - 1) * self.width + col, row1 * self.width + col)
+                     for col in range(col0, col1)]
+        else:
+            cells = [(row * self.width + col1 - 1, row * self.width + col1)
+                     for row in range(row0, row1)]
+        flat = self.flat
+        free = [flat[inner] != FULL and flat[outer] != FULL
+                for inner, outer in cells]
+        pairs = []
+        run = []
+        for pair, is_free in zip(cells + [None], free + [False]):
+            if is_free:
+                run.append(pair)
+                continue
+            if len(run) >= WIDE_ENTRANCE:
+                pairs += [run[0], run[-1]]
+            elif run:
+                pairs.append(run[len(run) // 2])
+            run = []
+        # A diagonal move is an entrance of its own between two blocked pairs.
+        for pos in range(len(cells) - 1):
+            if free[pos] or free[pos + 1]:
+                continue
+            (inner_a, outer_a), (inner_b, outer_b) = cells[pos], cells[pos + 1]
+            for inner, outer in ((inner_a, outer_b), (inner_b, outer_a)):
+                if flat[inner] != FULL and flat[outer] != FULL:
+                    pairs.append((inner, outer))
+        self.borders[border] = pairs
+        return pairs
+
+    def cluster_borders(self, cluster):
+        """ Return the existing borders of the cluster. """
+        c_row, c_col = cluster
+        ans = []
+        if (c_row + 1) * self.cluster_size < self.height:
+            ans.append(('down', c_row, c_col))
+        if c_row > 0:
+            ans.append(('down', c_row - 1, c_col))
+        if (c_col + 1) * self.cluster_size < self.width:
+            ans.append(('right', c_row, c_col))
+        if c_col > 0:
+            ans.append(('right', c_row, c_col - 1))
+        return ans
+
+    def cluster_search(self, source, cluster, targets=()):
+        """
+        Dijkstra search from the cell source inside the cluster only.
+        Stop when all targets are reached (explore the whole cluster
+        if there are none). Return dicts of costs and predecessors.
+        """
+        row0, row1, col0, col1 = self.cluster_bounds(cluster)
+        width, flat = self.width, self.flat
+        diagonal_cost = self.diagonal_cost
+        costs = {source: 0}
+        came_from = {}
+        left = set(targets)
+        left.discard(source)
+        heap = [(0, source)]
+        done = set()
+        while heap and (left or not targets):
+            cost, cell = heapq.heappop(heap)
+            if cell in done:
+                continue
+            done.add(cell)
+            left.discard(cell)
+            row, col = divmod(cell, width)
+            for row_offset, col_offset in EIGHT_MOVES:
+                n_row, n_col = row + row_offset, col + col_offset
+                if not (row0 <= n_row < row1 and col0 <= n_col < col1):
+                    continue
+                neighbor = n_row * width + n_col
+                if flat[neighbor] == FULL or neighbor in done:
+                    continue
+                n_cost = cost + (diagonal_cost if row_offset and col_offset
+                                 else 1)
+                if n_cost < costs.get(neighbor, INF):
+                    costs[neighbor] = n_cost
+                    came_from[neighbor] = cell
+                    heapq.heappush(heap, (n_cost, neighbor))
+        return costs, came_from
+
+    def cluster_edges(self, cluster):
+        """
+        Return dict mapping every abstract node of the cluster to
+        a dict of its neighbor nodes and edge costs.
+        """
+        if cluster in self.clusters:
+            return self.clusters[cluster]
+        edges = {}
+        for border in self.cluster_borders(cluster):
+            for pair in self.transitions(border):
+                inner, outer = pair
+                if self.cluster_of(inner) != cluster:
+                    inner, outer = outer, inner
+                step = (1 if outer - inner in (1, -1, self.width, -self.width)
+                        else self.diagonal_cost)
+                edges.setdefault(inner, {})[outer] = step
+        nodes = list(edges)
+        for node in nodes:
+            costs, _came_from = self.cluster_search(node, cluster, nodes)
+            for other in nodes:
+                if other != node and other in costs:
+                    edges[node][other] = costs[other]
+        self.clusters[cluster] = edges
+        return edges
+
+    def abstract_search(self, start, end):
+        """
+        Return list of abstract nodes from cell start to cell end,
+        including both (empty if there is no path).
+        """
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+        # Temporary edges connect start and end with their clusters' nodes.
+        extra = {start: {}}
+        start_nodes = self.cluster_edges(start_cluster)
+        costs, _came_from = self.cluster_search(
+            start, start_cluster, list(start_nodes) + [end])
+        for node in start_nodes:
+            if node in costs:
+                extra[start][node] = costs[node]
+        if end in costs:
+            extra[start][end] = costs[end]
+        end_nodes = self.cluster_edges(end_cluster)
+        costs, _came_from = self.cluster_search(end, end_cluster,
+                                                list(end_nodes))
+        for node in end_nodes:
+            if node in costs:
+                extra.setdefault(node, {})[end] = costs[node]
+
+        h_field = self.get_h_field(self.to_cell(end))
+        g_score = {start: 0}
+        came_from = {}
+        heap = [(0, start)]
+        closed = set()
+        self.expansions = 0
+        while heap:
+            _priority, node = heapq.heappop(heap)
+            if node == end:
+                path = [end]
+                while path[-1] in came_from:
+                    path.append(came_from[path[-1]])
+                return path[::-1]
+            if node in closed:
+                continue
+            closed.add(node)
+            self.expansions += 1
+            if self.mark_cells:
+                self.mark_search(node)
+            node_g = g_score[node]
+            for edges in (self.cluster_edges(self.cluster_of(node))
+                          .get(node, {}), extra.get(node, {})):
+                for neighbor, cost in edges.items():
+                    g_x = node_g + cost
+                    if g_x < g_score.get(neighbor, INF):
+                        g_score[neighbor] = g_x
+                        came_from[neighbor] = node
+                        heapq.heappush(heap, (g_x + h_field[neighbor],
+                                              neighbor))
+        return []
+
+    def refine(self, nodes):
+        """
+        Return flat indices of cells along abstract path nodes. Parts
+        of the path between two visits of the same cell are cut out,
+        so every cell is in the path once.
+        """
+        path = nodes[:1]
+        for node, next_node in zip(nodes, nodes[1:]):
+            cluster = self.cluster_of(node)
+            if cluster != self.cluster_of(next_node):
+                path.append(next_node)  # move across a border
+                continue
+            _costs, came_from = self.cluster_search(node, cluster,
+                                                    [next_node])
+            part = [next_node]
+            while part[-1] != node:
+                part.append(came_from[part[-1]])
+            path += part[-2::-1]
+        simple = []
+        positions = {}  # cell: its index in simple
+        for cell in path:
+            pos = positions.get(cell)
+            if pos is None:
+                positions[cell] = len(simple)
+                simple.append(cell)
+                continue
+            for dropped in simple[pos + 1:]:
+                del positions[dropped]
+            del simple[pos + 1:]
+        return simple
+
+    def a_star_search_iter(self, start_pos, end_pos):
+        """
+        Run the whole hierarchical search at once (abstract nodes are
+        marked as SEARCH cells) and set self.is_over if path is found.
+        The priority queue is left empty, as after any finished search.
+        """
+        if self.is_over or not self.p_queue:
+            return
+        self.p_queue.clear()
+        if self.cache_version != self.version:
+            self.invalidate()   # cells were changed directly
+        cells = self.refine(self.abstract_search(self.to_index(start_pos),
+                                                 self.to_index(end_pos)))
+        if self.stats is not None:
+            self.stats.expansions += self.expansions  # abstract nodes
+        if cells:
+            self.came_from.clear()
+            self.came_from.update(zip(cells[1:], cells))
+            self.is_over = True
+            return
+        # Diagonal moves through cluster corners are not in the abstract
+        # graph, so a path may exist anyway: search the grid itself.
+        Astar.clear_p_queue(self)
+        Astar.init_search(self, start_pos)
+        while self.p_queue and not self.is_over:
+            Astar.a_star_search_iter(self, start_pos, end_pos)
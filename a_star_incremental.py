@@ -0,0 +1,264 @@
+""" Incremental replanning (Lifelong Planning A*) for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import numpy as np
+
+from a_star_engine import Astar, FULL, PATH, INF
+
+
+class IncrementalAstar(Astar):
+    """
+    Lifelong Planning A* (LPA*) with the same start and end positions
+    between searches. Besides g(x) every cell keeps rhs(x): the best
+    cost through its neighbors. Cells where they differ are queued.
+    When obstacles change, only cells around the changed ones get
+    inconsistent, so replanning repairs the previous search instead
+    of starting from scratch.
+    Heuristic must be consistent, as the default one is.
+    """
+
+    def __init__(self, grid_width, grid_height, obstacle_list=None,
+                 start_pos=None, end_pos=None, diagonal_cost=math.sqrt(2),
+                 heuristic=None, **options):
+        """
+        Create a simulation like Astar with diagonal cost sqrt(2).
+        Raise ValueError for the bucket queue: priorities are tuples.
+        """
+        if options.get('queue') == 'bucket':
+            raise ValueError('Incremental search needs (cost, cost) '
+                             'priorities, queue bucket takes integers.')
+        self.rhs = {}           # one-step lookahead costs of cells
+        self.changed = set()    # cells that became FULL or stopped being so
+        self.search_ends = None # flat indices of start and end of search
+        # Grid version the search state is valid for: changes through
+        # set_value, set_values and clear_from keep it up to date, any
+        # other change (e.g. direct writes to cells) starts a new search.
+        self.search_version = None
+        self.expansions = 0     # cells popped since the last (re)plan
+        Astar.__init__(self, grid_width, grid_height, obstacle_list,
+                       start_pos, end_pos, diagonal_cost, heuristic,
+                       **options)
+        self.changed.clear()
+
+    def clear_p_queue(self):
+        """ Clear priority queue and all search state. """
+        Astar.clear_p_queue(self)
+        self.rhs.clear()
+        self.changed.clear()
+        self.search_ends = None
+
+    def keep_search(self, version):
+        """ Keep search state valid if it was for the version. """
+        if self.search_version == version:
+            self.search_version = self.version
+
+    def set_value(self, row, col, value):
+        """ Set the cell value and remember if its passability changed. """
+        idx = row * self.width + col
+        if (self.flat[idx] == FULL) != (value == FULL):
+            self.changed.add(idx)
+        version = self.version
+        Astar.set_value(self, row, col, value)
+        self.keep_search(version)
+
+    def set_values(self, cells, value):
+        """ Set the cells at once and remember passability changes. """
+        idx = self.cell_indices(cells)
+        flips = idx[(self.cells.reshape(-1)[idx] == FULL) != (value == FULL)]
+        self.changed.update(flips.tolist())
+        version = self.version
+        changed = Astar.set_values(self, cells, value)
+        self.keep_search(version)
+        return changed
+
+    def clear_from(self, value):
+        """ Update cells with the value to EMPTY, remember freed cells. """
+        if value == FULL:
+            self.changed.update(np.flatnonzero(self.cells == FULL).tolist())
+        version = self.version
+        Astar.clear_from(self, value)
+        self.keep_search(version)
+
+    def clear_marks(self):
+        """ Clear cells left by searches, keep search state. """
+        version = self.version
+        Astar.clear_marks(self)
+        self.keep_search(version)
+
+    def key(self, cell):
+        """ Return priority of the cell: (min(g, rhs) + h, min(g, rhs)). """
+        cost = min(self.g_score.get(cell, INF), self.rhs.get(cell, INF))
+        # Rounding keeps equal sums of diagonal costs equal.
+        return (round(cost + self.h_field[cell], 9), round(cost, 9))
+
+    def update_cell(self, cell):
+        """ Recompute rhs of the cell and (re)queue it if inconsistent. """
+        if cell != self.search_ends[0]:
+            best_cost, best_cell = INF, None
+            if self.flat[cell] != FULL:
+                g_score, flat = self.g_score, self.flat
+                for offset, step in self.move_table[self.border_key(cell)]:
+                    neighbor = cell + offset
+                    if flat[neighbor] == FULL:
+                        continue
+                    cost = g_score.get(neighbor, INF) + step
+                    if cost < best_cost:
+                        best_cost, best_cell = cost, neighbor
+            self.rhs[cell] = best_cost
+            if best_cell is None:
+                self.came_from.pop(cell, None)
+            else:
+                self.came_from[cell] = best_cell
+        if cell in self.p_queue:
+            self.p_queue.remove(cell)
+        if self.g_score.get(cell, INF) != self.rhs.get(cell, INF):
+            self.p_queue.push(cell, self.key(cell))
+            if self.mark_cells:
+                self.mark_search(cell)
+
+    def init_search(self, start_pos):
+        """ Forget previous search and put start position into queue. """
+        self.is_over = False
+        self.p_queue.clear()
+        self.g_score.clear()
+        self.came_from.clear()
+        self.rhs.clear()
+        self.changed.clear()
+        self.search_ends = None
+        self.search_version = self.version
+        start = self.to_index(start_pos)
+        self.rhs[start] = 0
+        self.p_queue.push(start, (0, 0))
+
+    def a_star_search_iter(self, start_pos, end_pos):
+        """
+        Execute one iteration of LPA*: update the cell with the lowest
+        priority. Set self.is_over when cost of the end position is
+        final, i.e. the end is consistent and no queued cell can lower it.
+        """
+        end = self.to_index(end_pos)
+        if self.search_ends is None:
+            self.search_ends = (self.to_index(start_pos), end)
+        self.get_h_field(end_pos)
+        if self.search_done(end):
+            self.is_over = self.g_score.get(end, INF) < INF
+            return
+        if not self.p_queue:
+            return
+        if self.stats is not None:
+            self.count_update()
+            return
+        cell = self.p_queue.pop()
+        self.expansions += 1
+        self.update_popped(cell)
+
+    def update_popped(self, cell):
+        """ Make the popped cell consistent and update its neighbors. """
+        g_score = self.g_score
+        if g_score.get(cell, INF) > self.rhs.get(cell, INF):
+            g_score[cell] = self.rhs[cell]
+        else:
+            g_score[cell] = INF
+            self.update_cell(cell)
+        for offset, _step in self.move_table[self.border_key(cell)]:
+            self.update_cell(cell + offset)
+
+    def count_update(self):
+        """
+        Pop and update a cell like a_star_search_iter and add its work
+        to self.stats. A cell that already has g(x) was expanded before
+        and is reopened.
+        """
+        stats = self.stats
+        queue = self.p_queue
+        stale_pops = queue.stale_pops
+        cell = queue.pop()
+        self.expansions += 1
+        stats.expansions += 1
+        stats.stale_pops += queue.stale_pops - stale_pops
+        stats.neighbor_checks += self.neighbor_checks(cell)
+        if stats.tracer is not None:
+            stats.tracer(self.to_cell(cell), self.rhs.get(cell, INF))
+        if cell in self.g_score:
+            stats.reopened += 1
+        count = queue.count
+        self.update_popped(cell)
+        stats.pushes += queue.count - count
+
+    def search_done(self, end):
+        """ Check whether queued cells can not change cost of end cell. """
+        queue = self.p_queue
+        stale_pops = queue.stale_pops
+        lowest = queue.min_priority((INF, INF))   # may pop stale entries
+        if self.stats is not None:
+            self.stats.stale_pops += queue.stale_pops - stale_pops
+        return (lowest >= self.key(end)
+                and self.rhs.get(end, INF) == self.g_score.get(end, INF))
+
+    def replan(self):
+        """
+        Repair the last search after cells changed through set_value,
+        set_values or clear_from and return the new path (empty if
+        there is none). The search starts anew if the grid was changed
+        in other ways.
+        """
+        start, end = self.search_ends
+        start_pos, end_pos = self.to_cell(start), self.to_cell(end)
+        if self.version != self.search_version:
+            self.init_search(start_pos)
+            self.search_ends = (start, end)
+        self.get_h_field(end_pos)
+        self.expansions = 0
+        changed, self.changed = self.changed, set()
+        for cell in changed:
+            self.update_cell(cell)
+            for offset, _step in self.move_table[self.border_key(cell)]:
+                self.update_cell(cell + offset)
+        while self.p_queue and not self.search_done(end):
+            self.a_star_search_iter(start_pos, end_pos)
+        self.is_over = self.g_score.get(end, INF) < INF
+        return self.reconstruct_path(end_pos) if self.is_over else []
+
+    def a_star_search(self, start_pos, end_pos):
+        """
+        Return a list of grid cells forming a path from start to end
+        (empty if there is no path). The search is repaired if start
+        and end are the same as in the previous one, else started anew.
+        """
+        self.check_cell(start_pos)
+        self.check_cell(end_pos)
+        if (self.components is not None
+                and not self.components.connected(start_pos, end_pos)):
+            return []
+        stats = self.stats
+        if stats is not None:
+            stats.searches += 1
+            stats.start()
+        ends = (self.to_index(start_pos), self.to_index(end_pos))
+        if ends != self.search_ends:
+            self.init_search(start_pos)
+            self.search_ends = ends
+            self.expansions = 0
+        if stats is not None:
+            stats.lap('setup')
+        path = self.replan()
+        if stats is not None:
+            stats.lap('search')
+        if self.mark_cells:
+            self.clear_from(PATH)
+            for cell in path[1:-1]:
+                self.set_value(cell[0], cell[1], PATH)
+        if stats is not None:
+            stats.lap('path')
+        return path
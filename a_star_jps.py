@@ -0,0 +1,265 @@
+""" Jump Point Search on top of 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import numpy as np
+
+from a_star_engine import Astar, EIGHT_MOVES, FULL, INF
+
+
+SHORT_RUN = 8   # cells of a straight run checked before a numpy scan
+
+
+class JumpPointSearch(Astar):
+    """
+    A* that expands only jump points: cells where an optimal path may
+    turn. Straight and diagonal runs between them are skipped without
+    putting cells into the priority queue. Diagonal moves are allowed
+    next to obstacles, as in Astar. Paths are optimal for diagonal cost
+    between 1 and 2 (exclusive), e.g. math.sqrt(2).
+    """
+
+    def __init__(self, grid_width, grid_height, obstacle_list=None,
+                 start_pos=None, end_pos=None, diagonal_cost=math.sqrt(2),
+                 heuristic=None, **options):
+        """
+        Create a simulation like Astar with diagonal cost sqrt(2).
+        Raise ValueError if diagonal cost breaks the pruning rules.
+        """
+        if not 1 < diagonal_cost < 2:
+            raise ValueError('Jump Point Search needs 1 < diagonal_cost < 2.')
+        # Free cells padded with a blocked border for straight scans,
+        # valid while the grid version equals free_version.
+        self.free = None
+        self.free_version = None
+        Astar.__init__(self, grid_width, grid_height, obstacle_list,
+                       start_pos, end_pos, diagonal_cost, heuristic,
+                       **options)
+
+    def walkable(self, row, col):
+        """ Check whether (row, col) is inside the grid and not FULL. """
+        return (0 <= row < self.height and 0 <= col < self.width
+                and self.flat[row * self.width + col] != FULL)
+
+    def directions(self, row, col, parent):
+        """
+        Return (row, col) directions of moves from the cell worth
+        jumping: the direction of arrival, its components if diagonal,
+        and forced ones around adjacent obstacles.
+        All eight directions for the start cell (parent is None).
+        """
+        if parent is None:
+            return EIGHT_MOVES
+        walkable = self.walkable
+        parent_row, parent_col = divmod(parent, self.width)
+        d_row = (row > parent_row) - (row < parent_row)
+        d_col = (col > parent_col) - (col < parent_col)
+        ans = []
+        if d_row and d_col:
+            if walkable(row + d_row, col):
+                ans.append((d_row, 0))
+            if walkable(row, col + d_col):
+                ans.append((0, d_col))
+            ans.append((d_row, d_col))
+            if not walkable(row, col - d_col):
+                ans.append((d_row, -d_col))
+            if not walkable(row - d_row, col):
+                ans.append((-d_row, d_col))
+        elif d_row:
+            ans.append((d_row, 0))
+            if not walkable(row, col + 1):
+                ans.append((d_row, 1))
+            if not walkable(row, col - 1):
+                ans.append((d_row, -1))
+        else:
+            ans.append((0, d_col))
+            if not walkable(row + 1, col):
+                ans.append((1, d_col))
+            if not walkable(row - 1, col):
+                ans.append((-1, d_col))
+        return ans
+
+    def init_search(self, start_pos):
+        """
+        Rebuild map of free cells if the grid changed other than through
+        set_value and set_values, and start search from start_pos.
+        """
+        if self.free_version != self.version:
+            self.free = np.zeros((self.height + 2, self.width + 2),
+                                 dtype=bool)
+            self.free[1:-1, 1:-1] = self.cells != FULL
+            self.free_version = self.version
+        Astar.init_search(self, start_pos)
+
+    def keep_free(self, version):
+        """ Mark map of free cells valid if it was for the version. """
+        if self.free_version == version:
+            self.free_version = self.version
+
+    def clear_from(self, value):
+        """ Update cells with the value to EMPTY, keep map of free cells. """
+        version = self.version
+        Astar.clear_from(self, value)
+        if value != FULL:
+            self.keep_free(version)
+
+    def clear_marks(self):
+        """ Clear cells left by searches, keep map of free cells. """
+        version = self.version
+        Astar.clear_marks(self)
+        self.keep_free(version)
+
+    def set_value(self, row, col, value):
+        """ Set the cell value and update map of free cells. """
+        version = self.version
+        Astar.set_value(self, row, col, value)
+        if self.free_version == version and self.version != version:
+            self.free[row + 1, col + 1] = value != FULL
+            self.keep_free(version)
+
+    def set_values(self, cells, value):
+        """ Set the cells at once and update map of free cells. """
+        version = self.version
+        changed = Astar.set_values(self, cells, value)
+        if self.free_version == version and len(changed):
+            rows, cols = np.divmod(changed, self.width)
+            self.free[rows + 1, cols + 1] = value != FULL
+            self.keep_free(version)
+        return changed
+
+    @staticmethod
+    def scan(lines, line, pos, step, end):
+        """
+        Return number of steps along lines[line] of padded free cells
+        from position pos in direction step (+1 or -1) to the first
+        jump point, or None at an obstacle. End is the position of
+        the end cell on this line (None if it is not on the line).
+        A cell is a jump point if a cell on a neighbor line is blocked
+        and the next one in direction of move is free.
+        """
+        if step > 0:
+            ahead = [lines[i, pos + 1:-1] for i in (line - 1, line, line + 1)]
+            beyond = [lines[i, pos + 2:] for i in (line - 1, line + 1)]
+        else:
+            ahead = [lines[i, 1:pos][::-1] for i in (line - 1, line, line + 1)]
+            beyond = [lines[i, :max(pos - 1, 0)][::-1]
+                      for i in (line - 1, line + 1)]
+        side_a, middle, side_b = ahead
+        blocked = ~middle
+        limit = int(blocked.argmax()) if blocked.any() else len(middle)
+        forced = ((beyond[0] & ~side_a) | (beyond[1] & ~side_b))[:limit]
+        ans = int(forced.argmax()) if forced.any() else None
+        if end is not None:
+            end_steps = (end - pos) * step - 1
+            if 0 <= end_steps < limit and (ans is None or end_steps < ans):
+                ans = end_steps
+        return None if ans is None else ans + 1
+
+    def is_forced(self, row, col, d_row, d_col):
+        """
+        Check whether the cell (row, col) entered in direction
+        (d_row, d_col) has a forced neighbor, i.e. is a jump point.
+        """
+        walkable = self.walkable
+        if d_row and d_col:
+            return ((walkable(row + d_row, col - d_col)
+                     and not walkable(row, col - d_col))
+                    or (walkable(row - d_row, col + d_col)
+                        and not walkable(row - d_row, col)))
+        if d_row:
+            return ((walkable(row + d_row, col + 1)
+                     and not walkable(row, col + 1))
+                    or (walkable(row + d_row, col - 1)
+                        and not walkable(row, col - 1)))
+        return ((walkable(row + 1, col + d_col)
+                 and not walkable(row + 1, col))
+                or (walkable(row - 1, col + d_col)
+                    and not walkable(row - 1, col)))
+
+    def jump(self, row, col, d_row, d_col, end_cell):
+        """
+        Move from (row, col) in direction (d_row, d_col) and return
+        the first jump point as (row, col), or None at an obstacle.
+        Straight runs longer than SHORT_RUN are scanned with numpy.
+        """
+        walkable = self.walkable
+        straight = not (d_row and d_col)
+        steps = 0
+        while not straight or steps < SHORT_RUN:
+            row += d_row
+            col += d_col
+            steps += 1
+            if not walkable(row, col):
+                return None
+            if (row, col) == end_cell or self.is_forced(row, col,
+                                                        d_row, d_col):
+                return (row, col)
+            # Turn point if a straight run from here finds a jump point.
+            if not straight and (
+                    self.jump(row, col, d_row, 0, end_cell) is not None
+                    or self.jump(row, col, 0, d_col, end_cell) is not None):
+                return (row, col)
+
+        if d_row:
+            end = end_cell[0] + 1 if end_cell[1] == col else None
+            steps = self.scan(self.free.T, col + 1, row + 1, d_row, end)
+            return None if steps is None else (row + steps * d_row, col)
+        end = end_cell[1] + 1 if end_cell[0] == row else None
+        steps = self.scan(self.free, row + 1, col + 1, d_col, end)
+        return None if steps is None else (row, col + steps * d_col)
+
+    def expand(self, cur_cell, end_pos):
+        """ Relax jump points reachable from the cell cur_cell. """
+        cur_g = self.g_score[cur_cell]
+        h_field = self.get_h_field(end_pos)
+        end_cell = tuple(end_pos)
+        row, col = divmod(cur_cell, self.width)
+        for d_row, d_col in self.directions(row, col,
+                                            self.came_from.get(cur_cell)):
+            point = self.jump(row, col, d_row, d_col, end_cell)
+            if point is None:
+                continue
+            neighbor = point[0] * self.width + point[1]
+            if neighbor in self.closed:
+                continue
+            steps_row, steps_col = abs(point[0] - row), abs(point[1] - col)
+            g_x = cur_g + (max(steps_row, steps_col) + (self.diagonal_cost - 1)
+                           * min(steps_row, steps_col))
+            if g_x < self.g_score.get(neighbor, INF):
+                self.g_score[neighbor] = g_x
+                self.came_from[neighbor] = cur_cell
+                self.add_cell(neighbor, g_x + h_field[neighbor])
+                if self.mark_cells:
+                    self.mark_search(neighbor)
+
+    def neighbor_checks(self, cur_cell):
+        """ Return number of directions scanned by expanding the cell. """
+        row, col = divmod(cur_cell, self.width)
+        return len(self.directions(row, col, self.came_from.get(cur_cell)))
+
+    def reconstruct_path(self, current):
+        """
+        Return path of (row, col) cells from start to current cell
+        with all cells between consecutive jump points.
+        """
+        points = Astar.reconstruct_path(self, current)
+        path = points[:1]
+        for row, col in points[1:]:
+            prev_row, prev_col = path[-1]
+            d_row = (row > prev_row) - (row < prev_row)
+            d_col = (col > prev_col) - (col < prev_col)
+            while (prev_row, prev_col) != (row, col):
+                prev_row += d_row
+                prev_col += d_col
+                path.append((prev_row, prev_col))
+        return path
@@ -0,0 +1,198 @@
+""" Optional compiled A* search loop for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import heapq
+import math
+import numpy as np
+
+
+FULL = 1    # the only value of cells that can not be passed
+
+BACKENDS = ('python', 'numba')
+HEURISTIC_CODES = {'euclidean': 0, 'octile': 1, 'manhattan': 2,
+                   'chebyshev': 3}
+
+# Stamps of cells for the current generation: seen cells have costs,
+# closed cells are expanded. Older stamps mean unseen cells.
+SEEN = 0
+CLOSED = 1
+MAX_GENERATION = 2 ** 32 - 2
+
+
+def search(cells, width, height, start, end, moves, heuristic, weight,
+           diagonal_cost, g_score, came_from, stamps, generation):
+    """
+    A* search from flat index start to end over flat array of cells,
+    the same as Astar.a_star_search: moves (array of row and column
+    offsets in the order of EIGHT_MOVES), queue entries ordered by
+    (priority, push count), heuristic computed per cell by its code.
+    State arrays hold g(x), predecessors and stamps of every cell and
+    are valid only for cells stamped with generation, so nothing is
+    cleared between searches.
+    Return (array of flat indices of the path, number of expansions);
+    the path is empty if there is no path.
+    """
+    end_row, end_col = end // width, end % width
+    g_score[start] = 0.0
+    stamps[start] = generation + SEEN
+    heap = [(0.0, 0, start)]
+    count = 1
+    expansions = 0
+    found = False
+    while heap:
+        _priority, _count, cur_cell = heapq.heappop(heap)
+        if stamps[cur_cell] == generation + CLOSED:
+            continue    # outdated entry of a cell popped before
+        if cur_cell == end:
+            found = True
+            break
+        stamps[cur_cell] = generation + CLOSED
+        expansions += 1
+        cur_g = g_score[cur_cell]
+        row, col = cur_cell // width, cur_cell % width
+        for move in range(moves.shape[0]):
+            n_row = row + moves[move, 0]
+            n_col = col + moves[move, 1]
+            if n_row < 0 or n_row >= height or n_col < 0 or n_col >= width:
+                continue
+            neighbor = n_row * width + n_col
+            stamp = stamps[neighbor]
+            if stamp == generation + CLOSED or cells[neighbor] == FULL:
+                continue
+            if moves[move, 0] != 0 and moves[move, 1] != 0:
+                g_x = cur_g + diagonal_cost
+            else:
+                g_x = cur_g + 1.0
+            if stamp == generation + SEEN and g_x >= g_score[neighbor]:
+                continue
+            g_score[neighbor] = g_x
+            came_from[neighbor] = cur_cell
+            stamps[neighbor] = generation + SEEN
+            d_row = float(abs(n_row - end_row))
+            d_col = float(abs(n_col - end_col))
+            if heuristic == 0:
+                h_x = math.hypot(d_row, d_col)
+            elif heuristic == 1:
+                h_x = (max(d_row, d_col)
+                       + (diagonal_cost - 1) * min(d_row, d_col))
+            elif heuristic == 2:
+                h_x = d_row + d_col
+            else:
+                h_x = max(d_row, d_col)
+            if weight != 1:
+                h_x *= weight
+            heapq.heappush(heap, (g_x + h_x, count, neighbor))
+            count += 1
+    if not found:
+        return np.empty(0, dtype=np.int64), expansions
+    length = 1
+    cell = end
+    while cell != start:
+        cell = came_from[cell]
+        length += 1
+    path = np.empty(length, dtype=np.int64)
+    cell = end
+    for idx in range(length - 1, -1, -1):
+        path[idx] = cell
+        if idx:
+            cell = came_from[cell]
+    return path, expansions
+
+
+compiled_search = None  # search() compiled by numba, False without it
+
+
+def get_compiled_search():
+    """
+    Return search() compiled by numba or None if numba is not installed.
+    Numba is imported on the first call only: it takes longer to import
+    than all the rest, and most programs never need it.
+    """
+    global compiled_search
+    if compiled_search is None:
+        try:
+            import numba
+        except ImportError:     # searches stay in pure Python
+            compiled_search = False
+        else:
+            # Compiled on the first call; cache keeps machine code
+            # between runs.
+            compiled_search = numba.njit(cache=True, nogil=True)(search)
+    return compiled_search or None
+
+
+def make_kernel(grid, backend='python'):
+    """
+    Return SearchKernel for the grid if the backend is 'numba' and
+    numba can be imported, otherwise None: searches run in Python.
+    Raise ValueError for an unknown backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend: {}.'.format(backend))
+    if backend == 'numba' and get_compiled_search() is not None:
+        return SearchKernel(grid)
+    return None
+
+
+class SearchKernel:
+    """
+    Compiled search over cells of a grid with state arrays of the grid
+    size, allocated on the first search and reused by later ones.
+    """
+
+    def __init__(self, grid, moves=None):
+        """ Create a kernel for the grid (8-connected by default). """
+        self.grid = grid
+        if moves is None:
+            moves = tuple((row_offset, col_offset)
+                          for row_offset in range(-1, 2)
+                          for col_offset in range(-1, 2)
+                          if (row_offset, col_offset) != (0, 0))
+        self.moves = np.array(moves, dtype=np.int64)
+        self.g_score = None     # state arrays, see search()
+        self.came_from = None
+        self.stamps = None
+        self.generation = 0
+        self.expansions = 0     # cells expanded by the last search
+
+    def next_generation(self):
+        """ Return stamp base of a new search, allocate state if needed. """
+        size = self.grid.width * self.grid.height
+        if self.stamps is None or len(self.stamps) != size:
+            self.g_score = np.empty(size, dtype=np.float64)
+            self.came_from = np.empty(size, dtype=np.int64)
+            self.stamps = np.zeros(size, dtype=np.uint32)
+            self.generation = 0
+        self.generation += 2
+        if self.generation > MAX_GENERATION:
+            self.stamps[:] = 0
+            self.generation = 2
+        return self.generation
+
+    def search(self, start, end, heuristic, weight, diagonal_cost):
+        """
+        Return list of flat indices of the cheapest path from start
+        to end (empty if there is no path).
+        """
+        if heuristic not in HEURISTIC_CODES:
+            raise ValueError('Unknown heuristic: {}.'.format(heuristic))
+        grid = self.grid
+        generation = self.next_generation()
+        # asarray drops np.memmap subclass without copying cells.
+        cells = np.asarray(grid.cells).reshape(-1)
+        path, self.expansions = get_compiled_search()(
+            cells, grid.width, grid.height, start, end, self.moves,
+            HEURISTIC_CODES[heuristic], float(weight),
+            float(diagonal_cost), self.g_score, self.came_from,
+            self.stamps, generation)
+        return path.tolist()
@@ -0,0 +1,139 @@
+""" Saving and loading of grids for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import os
+import struct
+import numpy as np
+
+from a_star_engine import Grid, EMPTY, FULL, grid_from_text
+
+
+# Binary map file: header, then cells row by row, either one uint8 value
+# per cell or bits of obstacles (np.packbits of each row, the first cell
+# in the highest bit). Unpacked cells are aligned for np.memmap.
+MAGIC = b'ASTARMAP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHII12x')  # magic, version, packed, width, height
+RAW = 0     # one uint8 cell value per byte
+PACKED = 1  # one bit per cell, 1 for FULL
+
+IMAGE_EXTENSIONS = ('.png', '.bmp', '.gif', '.jpg', '.jpeg', '.tga')
+TEXT_EXTENSIONS = ('.map', '.txt')
+
+
+def save_grid(grid, path, packed=False):
+    """
+    Save cells of the grid to a binary map file. Packed files take
+    one bit per cell but keep only obstacles, other cells are EMPTY
+    when loaded.
+    """
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, PACKED if packed else RAW,
+                         grid.width, grid.height)
+    with open(path, 'wb') as map_file:
+        map_file.write(header)
+        if packed:
+            map_file.write(np.packbits(grid.cells == FULL, axis=1).tobytes())
+        else:
+            map_file.write(np.ascontiguousarray(grid.cells).tobytes())
+
+
+def read_header(map_file):
+    """
+    Return (packing, width, height) from the header of a binary map.
+    Raise ValueError if the file is not a binary map.
+    """
+    data = map_file.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError('File is too short for a map header.')
+    magic, version, packing, width, height = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError('File is not a binary map.')
+    if version != FORMAT_VERSION or packing not in (RAW, PACKED):
+        raise ValueError('Unknown map format: version {}, packing {}.'
+                         .format(version, packing))
+    return packing, width, height
+
+
+def load_grid(path, mmap_mode=None):
+    """
+    Return Grid with cells from a binary map file.
+    With mmap_mode ('r', 'r+' or 'c' as in np.memmap) cells of an
+    unpacked file are mapped from the file without reading it:
+    'r+' writes changes of cells to the file, 'c' keeps them in memory
+    and 'r' makes cells read-only (searches need mark_cells=False).
+    Packed files are always unpacked into memory.
+    """
+    with open(path, 'rb') as map_file:
+        packing, width, height = read_header(map_file)
+        if mmap_mode is not None and packing == RAW:
+            cells = np.memmap(path, dtype=np.uint8, mode=mmap_mode,
+                              offset=HEADER.size, shape=(height, width))
+            return Grid(width, height, cells)
+        if packing == PACKED:
+            row_bytes = (width + 7) // 8
+            bits = np.fromfile(map_file, dtype=np.uint8,
+                               count=row_bytes * height)
+            full = np.unpackbits(bits.reshape(height, row_bytes), axis=1,
+                                 count=width).astype(bool)
+            cells = np.where(full, FULL, EMPTY).astype(np.uint8)
+        else:
+            cells = np.fromfile(map_file, dtype=np.uint8,
+                                count=width * height)
+            cells = cells.reshape(height, width)
+    if cells.size != width * height:
+        raise ValueError('File is too short for a {}x{} map.'.format(
+            width, height))
+    return Grid(width, height, cells)
+
+
+def grid_from_image(path, threshold=128):
+    """
+    Return Grid built from an image file (PNG and others pygame loads),
+    one cell per pixel: pixels darker than threshold are obstacles.
+    """
+    import pygame   # only images need it
+    surface = pygame.image.load(path)
+    # surfarray is indexed by (x, y), cells by (row, col).
+    pixels = pygame.surfarray.array3d(surface).transpose(1, 0, 2)
+    brightness = pixels.astype(np.uint16).sum(axis=2) / 3
+    height, width = brightness.shape
+    grid = Grid(width, height)
+    grid.cells[brightness < threshold] = FULL
+    return grid
+
+
+def grid_to_text(grid, movingai=False):
+    """
+    Return lines of the grid as text: '@' for obstacles and '.' for
+    other cells, with the header of Moving AI '.map' files if movingai.
+    """
+    chars = np.where(grid.cells == FULL, ord('@'), ord('.')).astype(np.uint8)
+    lines = [row.tobytes().decode('latin-1') + '\n' for row in chars]
+    if movingai:
+        lines[:0] = ['type octile\n', 'height {}\n'.format(grid.height),
+                     'width {}\n'.format(grid.width), 'map\n']
+    return lines
+
+
+def load_map(path, mmap_mode=None):
+    """
+    Return Grid loaded from a file of any supported kind, chosen by
+    extension: images, text maps ('.map', '.txt') or binary maps.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return grid_from_image(path)
+    if extension in TEXT_EXTENSIONS:
+        with open(path) as map_file:
+            return grid_from_text(map_file)
+    return load_grid(path, mmap_mode)
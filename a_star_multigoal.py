@@ -0,0 +1,186 @@
+""" One-to-many A* search for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import numpy as np
+
+from a_star_engine import Astar, INF, LAZY_H_CELLS
+from a_star_heuristics import (heuristic_field, CELL_HEURISTICS,
+                               NearestHeuristicCells)
+
+
+class MultiGoalAstar(Astar):
+    """
+    A* from one start to many ends sharing one search: g(x), closed
+    cells and predecessors stay between the ends, so every cell is
+    expanded once for all of them.
+    Ends are reached one by one, nearest first. With a consistent
+    heuristic (the default one) costs of closed cells are final
+    whatever end the search was heading to, so after an end is reached
+    the open cells are only queued again with the heuristic of the next
+    end that is not closed yet. The nearest of several ends is found
+    with the lowest heuristic to any of them, which is consistent too.
+    Paths are optimal with weight 1.
+    """
+
+    def __init__(self, grid_width, grid_height, obstacle_list=None,
+                 start_pos=None, end_pos=None, diagonal_cost=math.sqrt(2),
+                 heuristic=None, **options):
+        """ Create a simulation like Astar with diagonal cost sqrt(2). """
+        Astar.__init__(self, grid_width, grid_height, obstacle_list,
+                       start_pos, end_pos, diagonal_cost, heuristic,
+                       **options)
+        self.goal_field = None  # heuristic used instead of get_h_field's
+
+    def get_h_field(self, end_pos):
+        """ Return heuristic of the current goals or of the end position. """
+        if self.goal_field is not None:
+            return self.goal_field
+        return Astar.get_h_field(self, end_pos)
+
+    def ends_field(self, ends):
+        """
+        Return flat heuristic field: lowest value for any of ends.
+        Values are computed on lookup if fields of all ends would
+        hold LAZY_H_CELLS values.
+        """
+        if len(ends) == 1:
+            return Astar.get_h_field(self, ends[0])     # cached
+        if self.width * self.height * len(ends) >= LAZY_H_CELLS:
+            return NearestHeuristicCells(self.width, ends, self.heuristic,
+                                         self.weight, self.diagonal_cost)
+        field = None
+        for end_pos in ends:
+            end_field = heuristic_field(self.width, self.height, end_pos,
+                                        self.heuristic, self.weight,
+                                        self.diagonal_cost)
+            field = (end_field if field is None
+                     else np.minimum(field, end_field, out=field))
+        return memoryview(field.reshape(-1))
+
+    def start_many(self, start_pos, field):
+        """ Start a new search from start_pos with the heuristic field. """
+        self.check_cell(start_pos)
+        self.clear_p_queue()
+        self.init_search(start_pos)
+        self.goal_field = field
+
+    def requeue(self, field):
+        """ Queue open cells again with priorities of another heuristic. """
+        self.goal_field = field
+        self.p_queue.clear()
+        g_score = self.g_score
+        for cell in g_score.keys() - self.closed:
+            self.p_queue.push(cell, g_score[cell] + field[cell])
+
+    def expand_until(self, goals):
+        """
+        Expand cells until one of goals (set of flat indices) is closed
+        and return it, or None if no open cells are left.
+        """
+        closed = self.closed
+        while self.p_queue:
+            cur_cell = self.pop_cell()
+            closed.add(cur_cell)
+            # Goals are expanded as well, the search may go on later.
+            if self.stats is None:
+                self.expand(cur_cell, None)
+            else:
+                self.count_expand(cur_cell, self.p_queue, self.g_score,
+                                  self.expand, cur_cell, None)
+            if cur_cell in goals:
+                return cur_cell
+        return None
+
+    def reachable(self, start_pos, ends):
+        """ Return list of ends that may be reached from start_pos. """
+        if self.components is None:
+            return list(ends)
+        return [end_pos for end_pos in ends
+                if self.components.connected(start_pos, end_pos)]
+
+    def search_all(self, start_pos, ends):
+        """
+        Return list of paths from start to every end (in the same
+        order, empty if there is no path) found by one search.
+        Paths are marked on the grid.
+        Raise IndexError if start or an end is outside the grid.
+        """
+        start_pos = tuple(start_pos)
+        ends = [tuple(end_pos) for end_pos in ends]
+        for end_pos in ends:
+            self.check_cell(end_pos)
+        # Nearest ends first: their searches expand the fewest cells.
+        todo = sorted(set(self.reachable(start_pos, ends)))
+        function = CELL_HEURISTICS[self.heuristic]
+        todo.sort(key=lambda end_pos: function(
+            abs(end_pos[0] - start_pos[0]), abs(end_pos[1] - start_pos[1]),
+            self.diagonal_cost))
+        self.start_many(start_pos, None)
+        for end_pos in todo:
+            end = self.to_index(end_pos)
+            if end in self.closed:
+                continue
+            self.requeue(self.ends_field([end_pos]))
+            self.expand_until({end})
+        self.goal_field = None
+
+        paths = []
+        for end_pos in ends:
+            if self.to_index(end_pos) in self.closed:
+                path = self.reconstruct_path(end_pos)
+                self.mark_path(path)
+            else:
+                path = []
+            paths.append(path)
+        return paths
+
+    def search_nearest(self, start_pos, ends):
+        """
+        Return (end, path) for the end with the cheapest path from
+        start, or (None, []) if no end can be reached.
+        The path is marked on the grid.
+        """
+        ends = [tuple(end_pos) for end_pos in ends]
+        for end_pos in ends:
+            self.check_cell(end_pos)
+        ends = self.reachable(start_pos, ends)
+        if not ends:
+            return None, []
+        self.start_many(start_pos, self.ends_field(ends))
+        end = self.expand_until({self.to_index(end_pos)
+                                 for end_pos in ends})
+        self.goal_field = None
+        if end is None:
+            return None, []
+        path = self.reconstruct_path(self.to_cell(end))
+        self.mark_path(path)
+        return self.to_cell(end), path
+
+    def distance_field(self, start_pos):
+        """
+        Return float array of costs of the cheapest paths from start
+        to every cell (Dijkstra map): INF for cells that can not be
+        reached and for obstacles. Cells are expanded as SEARCH cells.
+        """
+        self.start_many(tuple(start_pos),
+                        memoryview(np.zeros(self.width * self.height)))
+        self.expand_until(())
+        self.goal_field = None
+        distances = np.full(self.width * self.height, INF)
+        g_score = self.g_score
+        cells = np.fromiter(g_score.keys(), dtype=np.intp,
+                            count=len(g_score))
+        distances[cells] = np.fromiter(g_score.values(), dtype=float,
+                                       count=len(g_score))
+        return distances.reshape(self.height, self.width)
@@ -0,0 +1,293 @@
+""" Priority queues of cells for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import heapq
+
+
+REMOVED = -1    # placeholder for a cell removed from a heap
+
+
+# Every queue supports: push(item, priority) to add a new item or lower
+# priority of an existing one, pop() of the lowest priority item
+# (KeyError if empty), min_priority(), remove(item), clear(), len()
+# and 'in'. Attribute count grows with every push that changed the queue
+# (reset by clear) and stale_pops counts outdated entries thrown away
+# by pops (never reset), for a_star_stats.SearchStats.
+
+class LazyHeap:
+    """
+    Binary heap (heapq) with lazy deletion: an item with lowered
+    priority is pushed again and its old entry stays in the heap
+    marked as REMOVED until popped.
+    """
+
+    def __init__(self):
+        """ Create an empty queue. """
+        self.heap = []      # list of entries [priority, count, item]
+        self.entries = {}   # mapping of items to entries in a heap
+        self.count = 0   # unique sequence count for priority queue entries
+        self.stale_pops = 0 # REMOVED entries popped
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def clear(self):
+        """ Clear queue to be empty. """
+        self.heap.clear()
+        self.entries.clear()
+        self.count = 0
+
+    def push(self, item, priority=0):
+        """ Add a new item or update min priority of an existing item. """
+        entry = self.entries.get(item)
+        if entry is not None:
+            if priority >= entry[0]:
+                return
+            entry[-1] = REMOVED
+        entry = [priority, self.count, item]
+        self.entries[item] = entry
+        heapq.heappush(self.heap, entry)  # enqueue pointer to a list
+        self.count += 1
+
+    def remove(self, item):
+        """
+        Mark an existing item as REMOVED.
+        Removes item from self.entries, but REMOVED will stay in the heap.
+        """
+        entry = self.entries.pop(item)
+        entry[-1] = REMOVED
+
+    def pop(self):
+        """
+        Remove and return the lowest priority item.
+        Raise KeyError if empty.
+        """
+        while self.heap:
+            _priority, _count, item = heapq.heappop(self.heap)
+            if item is not REMOVED:
+                del self.entries[item]
+                return item
+            self.stale_pops += 1
+        raise KeyError('Pop from an empty priority queue.')
+
+    def min_priority(self, default=None):
+        """ Return the lowest priority or default if empty. """
+        heap = self.heap
+        while heap and heap[0][-1] is REMOVED:
+            heapq.heappop(heap)
+            self.stale_pops += 1
+        return heap[0][0] if heap else default
+
+
+class IndexedHeap:
+    """
+    D-ary heap that keeps position of every item, so lowering priority
+    of an item moves it up in place (true decrease-key) and the heap
+    never holds more entries than items.
+    Ties are broken in the same order as in LazyHeap.
+    """
+
+    def __init__(self, arity=4):
+        """ Create an empty queue where every node has arity children. """
+        self.arity = arity
+        self.items = []     # items arranged in a heap
+        self.keys = []      # (priority, count) of items, parallel list
+        self.position = {}  # mapping of items to their index in a heap
+        self.count = 0   # unique sequence count for ties
+        self.stale_pops = 0 # always 0, there are no outdated entries
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def clear(self):
+        """ Clear queue to be empty. """
+        self.items.clear()
+        self.keys.clear()
+        self.position.clear()
+        self.count = 0
+
+    def push(self, item, priority=0):
+        """ Add a new item or update min priority of an existing item. """
+        idx = self.position.get(item)
+        if idx is None:
+            self.items.append(item)
+            self.keys.append((priority, self.count))
+            idx = len(self.items) - 1
+        elif priority < self.keys[idx][0]:
+            self.keys[idx] = (priority, self.count)
+        else:
+            return
+        self.count += 1
+        self.sift_up(idx)
+
+    def remove(self, item):
+        """ Remove an existing item from the heap. """
+        idx = self.position.pop(item)
+        last_item = self.items.pop()
+        last_key = self.keys.pop()
+        if idx < len(self.items):
+            self.items[idx] = last_item
+            self.keys[idx] = last_key
+            self.position[last_item] = idx
+            self.sift_up(idx)
+            self.sift_down(self.position[last_item])
+
+    def pop(self):
+        """
+        Remove and return the lowest priority item.
+        Raise KeyError if empty.
+        """
+        if not self.items:
+            raise KeyError('Pop from an empty priority queue.')
+        top = self.items[0]
+        del self.position[top]
+        last_item = self.items.pop()
+        last_key = self.keys.pop()
+        if self.items:
+            self.items[0] = last_item
+            self.keys[0] = last_key
+            self.sift_down(0)
+        return top
+
+    def min_priority(self, default=None):
+        """ Return the lowest priority or default if empty. """
+        return self.keys[0][0] if self.keys else default
+
+    def sift_up(self, idx):
+        """ Move item at index idx up while it is lower than its parent. """
+        items, keys, position = self.items, self.keys, self.position
+        item, key = items[idx], keys[idx]
+        while idx > 0:
+            parent = (idx - 1) // self.arity
+            if not key < keys[parent]:
+                break
+            items[idx] = items[parent]
+            keys[idx] = keys[parent]
+            position[items[idx]] = idx
+            idx = parent
+        items[idx] = item
+        keys[idx] = key
+        position[item] = idx
+
+    def sift_down(self, idx):
+        """ Move item at index idx down while a child is lower. """
+        items, keys, position = self.items, self.keys, self.position
+        item, key = items[idx], keys[idx]
+        size = len(items)
+        while True:
+            first = idx * self.arity + 1
+            if first >= size:
+                break
+            last = min(first + self.arity, size)
+            child = first
+            child_key = keys[first]
+            for other in range(first + 1, last):
+                if keys[other] < child_key:
+                    child = other
+                    child_key = keys[other]
+            if not child_key < key:
+                break
+            items[idx] = items[child]
+            keys[idx] = child_key
+            position[items[idx]] = idx
+            idx = child
+        items[idx] = item
+        keys[idx] = key
+        position[item] = idx
+
+
+class BucketQueue:
+    """
+    Queue for non-negative integer priorities (e.g. unit move costs
+    with manhattan or chebyshev heuristic): a list of buckets indexed
+    by priority. Items of one bucket are popped last in, first out.
+    """
+
+    def __init__(self):
+        """ Create an empty queue. """
+        self.buckets = []       # buckets[priority] is a dict of items
+        self.priorities = {}    # mapping of items to their priority
+        self.lowest = 0         # all buckets below are empty
+        self.count = 0          # pushes since clear
+        self.stale_pops = 0     # always 0, there are no outdated entries
+
+    def __len__(self):
+        return len(self.priorities)
+
+    def __contains__(self, item):
+        return item in self.priorities
+
+    def clear(self):
+        """ Clear queue to be empty. """
+        self.buckets.clear()
+        self.priorities.clear()
+        self.lowest = 0
+        self.count = 0
+
+    def push(self, item, priority=0):
+        """
+        Add a new item or update min priority of an existing item.
+        Raise ValueError if priority is not a non-negative integer.
+        """
+        if priority < 0 or priority != int(priority):
+            raise ValueError('Bucket queue needs non-negative integer '
+                             'priorities, got {}.'.format(priority))
+        priority = int(priority)
+        old_priority = self.priorities.get(item)
+        if old_priority is not None:
+            if priority >= old_priority:
+                return
+            del self.buckets[old_priority][item]
+        while len(self.buckets) <= priority:
+            self.buckets.append({})
+        self.buckets[priority][item] = None
+        self.priorities[item] = priority
+        self.count += 1
+        if priority < self.lowest:
+            self.lowest = priority
+
+    def remove(self, item):
+        """ Remove an existing item from the queue. """
+        del self.buckets[self.priorities.pop(item)][item]
+
+    def pop(self):
+        """
+        Remove and return the lowest priority item.
+        Raise KeyError if empty.
+        """
+        if not self.priorities:
+            raise KeyError('Pop from an empty priority queue.')
+        while not self.buckets[self.lowest]:
+            self.lowest += 1
+        item, _ = self.buckets[self.lowest].popitem()
+        del self.priorities[item]
+        return item
+
+    def min_priority(self, default=None):
+        """ Return the lowest priority or default if empty. """
+        if not self.priorities:
+            return default
+        while not self.buckets[self.lowest]:
+            self.lowest += 1
+        return self.lowest
+
+
+QUEUES = {'lazy': LazyHeap,
+          'indexed': IndexedHeap,
+          'bucket': BucketQueue}
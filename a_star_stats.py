@@ -0,0 +1,75 @@
+""" Search counters and phase timers for 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import time
+
+
+COUNTERS = ('searches', 'expansions', 'pushes', 'decreased', 'reopened',
+            'stale_pops', 'neighbor_checks')
+PHASES = ('setup', 'search', 'path')
+
+
+class SearchStats:
+    """
+    Counters of search work and time spent in phases of a_star_search.
+    A solver counts its work only when its stats attribute is set to
+    an instance of this class, otherwise the search runs as usual:
+        searches - calls of a_star_search (cached paths included)
+        expansions - cells taken from the queue and expanded
+        pushes - cells pushed to the queue, new or with lower cost
+        decreased - pushes of cells already queued with higher cost
+        reopened - expansions of cells expanded before (only LPA*)
+        stale_pops - outdated entries popped from a lazy heap
+        neighbor_checks - neighbors (or jump directions) examined
+    Phases: setup (clearing state, heuristic field), search, path
+    (reconstruction, marking and caching), in seconds.
+    Tracer, if given, is called as tracer(cell, g) for every expanded
+    (row, col) cell with its cost from the start.
+    """
+
+    def __init__(self, tracer=None):
+        """ Create stats with zero counters. """
+        self.tracer = tracer
+        self.reset()
+
+    def reset(self):
+        """ Set all counters and timers to zero. """
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.timers = dict.fromkeys(PHASES, 0.0)
+        self.last = None    # time of the last start() or lap()
+
+    def start(self):
+        """ Start timing of the first phase. """
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        """ Add time since the last start() or lap() to the phase. """
+        now = time.perf_counter()
+        self.timers[phase] += now - self.last
+        self.last = now
+
+    def counters(self):
+        """ Return tuple of counter values in order of COUNTERS. """
+        return tuple(getattr(self, name) for name in COUNTERS)
+
+    def as_dict(self):
+        """ Return dict of all counters and timers (as 'time_<phase>'). """
+        stats = dict(zip(COUNTERS, self.counters()))
+        for phase, seconds in self.timers.items():
+            stats['time_' + phase] = seconds
+        return stats
+
+    def __str__(self):
+        return ', '.join('{} {}'.format(name.replace('_', ' '), value)
+                         for name, value in zip(COUNTERS, self.counters()))
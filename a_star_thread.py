@@ -0,0 +1,106 @@
+""" Search in a background thread for 'a_star_gui_pygame.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import queue
+import threading
+
+from a_star_engine import PATH
+
+
+BATCH_STEPS = 256   # search steps between sending events
+MAX_BATCHES = 64    # batches of events waiting for the GUI at most
+PUT_TIMEOUT = 0.05  # s to wait for room in the queue before checking stop
+
+DONE = None         # last item in the queue of events
+
+
+class SearchThread(threading.Thread):
+    """
+    Thread running the whole search of a simulation (Astar or its
+    subclass) from start to end and marking the path. Cells changed
+    by the search are sent as lists of (flat index, value) events
+    into a bounded queue, every BATCH_STEPS steps; DONE follows the
+    last list. The thread waits while the queue is full.
+    Nobody else may call methods of the simulation until the thread
+    ends (see cancel and join).
+    """
+
+    def __init__(self, simulation, start_pos, end_pos):
+        """ Create a thread, start it by start(). """
+        threading.Thread.__init__(self, daemon=True)
+        self.simulation = simulation
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.events = queue.Queue(MAX_BATCHES)
+        self.stop_event = threading.Event()
+        self.found = False  # set when the path is found
+
+    def run(self):
+        """ Search and send events until finished or cancelled. """
+        simulation = self.simulation
+        # Changed cells are collected here instead of the GUI's set.
+        gui_dirty, simulation.dirty = simulation.dirty, set()
+        try:
+            simulation.init_search(self.start_pos)
+            exhausted = False
+            while not (simulation.is_over or exhausted
+                       or self.stop_event.is_set()):
+                for _step in range(BATCH_STEPS):
+                    # Search may finish on a call with no open cells (LPA*).
+                    exhausted = not simulation.p_queue
+                    simulation.a_star_search_iter(self.start_pos,
+                                                  self.end_pos)
+                    if simulation.is_over or exhausted:
+                        break
+                self.send()
+            if simulation.is_over and not self.stop_event.is_set():
+                self.found = True
+                for row, col in simulation.reconstruct_path(
+                        self.end_pos)[1:-1]:
+                    simulation.set_value(row, col, PATH)
+                self.send()
+        finally:
+            simulation.dirty = gui_dirty
+            self.put(DONE)
+
+    def send(self):
+        """ Put events of cells changed since the last call. """
+        dirty = self.simulation.dirty
+        if dirty:
+            flat = self.simulation.flat
+            self.put([(idx, flat[idx]) for idx in dirty])
+            dirty.clear()
+
+    def put(self, item):
+        """ Put item into the queue, give up if cancelled. """
+        while True:
+            try:
+                self.events.put(item, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                if self.stop_event.is_set():
+                    return
+
+    def cancel(self):
+        """ Ask the thread to stop soon; join() waits for it. """
+        self.stop_event.set()
+
+    def get_events(self, block=False):
+        """
+        Return the next list of events, DONE at the end of search
+        or an empty list if there is nothing yet (unless block).
+        """
+        try:
+            return self.events.get(block)
+        except queue.Empty:
+            return []
@@ -0,0 +1,115 @@
+""" Tests of connected components in 'a_star_components.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import numpy as np
+import pytest
+
+from a_star_components import ComponentIndex, MAX_CELL_UPDATES
+from a_star_engine import Astar, EMPTY, FULL
+
+
+WIDTH = 24
+HEIGHT = 18
+SEEDS = (1, 2, 3)
+ROUNDS = 40
+
+
+def flood_fill(cells, diagonal):
+    """ Return dict of free (row, col) cells to numbers of components. """
+    if diagonal:
+        moves = [(d_row, d_col) for d_row in (-1, 0, 1)
+                 for d_col in (-1, 0, 1) if d_row or d_col]
+    else:
+        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    height, width = cells.shape
+    numbers = {}
+    for first in zip(*np.nonzero(cells != FULL)):
+        first = (int(first[0]), int(first[1]))
+        if first in numbers:
+            continue
+        numbers[first] = len(numbers)
+        stack = [first]
+        while stack:
+            row, col = stack.pop()
+            for d_row, d_col in moves:
+                cell = (row + d_row, col + d_col)
+                if (0 <= cell[0] < height and 0 <= cell[1] < width
+                        and cells[cell] != FULL and cell not in numbers):
+                    numbers[cell] = numbers[first]
+                    stack.append(cell)
+    return numbers
+
+
+def check_components(solver):
+    """ Check that components of the solver match a flood fill. """
+    numbers = flood_fill(solver.cells, solver.components.diagonal)
+    labels = {}
+    for row in range(HEIGHT):
+        for col in range(WIDTH):
+            label = solver.components.component((row, col))
+            if solver.cells[row, col] == FULL:
+                assert label == 0
+                continue
+            assert label != 0
+            # Same flood fill component iff same label.
+            number = numbers[row, col]
+            assert labels.setdefault(label, number) == number
+    assert len(labels) == len(set(numbers.values()))
+
+
+def make_solver(rng, diagonal, density=0.35):
+    """ Return Astar with components over random cells. """
+    cells = np.where(rng.random((HEIGHT, WIDTH)) < density,
+                     FULL, EMPTY).astype(np.uint8)
+    solver = Astar(WIDTH, HEIGHT, cells=cells, mark_cells=False,
+                   components=True)
+    if not diagonal:
+        solver.components = ComponentIndex(solver, diagonal=False)
+    return solver
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('diagonal', (True, False))
+def test_set_value_matches_flood_fill(seed, diagonal):
+    rng = np.random.default_rng(seed)
+    solver = make_solver(rng, diagonal)
+    check_components(solver)
+    for _ in range(ROUNDS):
+        row, col = int(rng.integers(HEIGHT)), int(rng.integers(WIDTH))
+        solver.set_value(row, col,
+                         EMPTY if solver.cells[row, col] == FULL else FULL)
+        check_components(solver)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('count', (5, MAX_CELL_UPDATES + 1))
+def test_set_values_matches_flood_fill(seed, count):
+    rng = np.random.default_rng(seed)
+    solver = make_solver(rng, True)
+    for round_idx in range(ROUNDS // 4):
+        cells = np.stack([rng.integers(HEIGHT, size=count),
+                          rng.integers(WIDTH, size=count)], axis=1)
+        solver.set_values(cells, FULL if round_idx % 2 else EMPTY)
+        check_components(solver)
+
+
+def test_direct_writes_rebuild():
+    rng = np.random.default_rng(SEEDS[0])
+    solver = make_solver(rng, True)
+    check_components(solver)
+    solver.cells[:, WIDTH // 2] = FULL
+    solver.cells[0, 0] = solver.cells[0, WIDTH - 1] = EMPTY
+    solver.version += 1
+    check_components(solver)
+    assert not solver.components.connected((0, 0), (0, WIDTH - 1))
+    assert solver.a_star_search((0, 0), (0, WIDTH - 1)) == []
@@ -0,0 +1,118 @@
+""" Tests of hierarchical search in 'a_star_hpa.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import numpy as np
+import pytest
+
+from a_star_engine import Astar, EMPTY, FULL
+from a_star_hpa import HierarchicalAstar
+
+
+WIDTH = 40
+HEIGHT = 32
+CLUSTER_SIZE = 8
+SEEDS = (1, 2, 3)
+ROUNDS = 5
+TOGGLES = 30
+QUERIES = 10
+
+
+def random_cells(rng, density=0.3):
+    """ Return random cells of the grid size. """
+    return np.where(rng.random((HEIGHT, WIDTH)) < density,
+                    FULL, EMPTY).astype(np.uint8)
+
+
+def random_queries(rng, cells):
+    """ Return list of (start, end) pairs of free cells. """
+    free = np.argwhere(cells != FULL)
+    queries = []
+    for _ in range(QUERIES):
+        start, end = rng.choice(len(free), 2, replace=False)
+        queries.append((tuple(free[start].tolist()),
+                        tuple(free[end].tolist())))
+    return queries
+
+
+def check_path(cells, path, start_pos, end_pos):
+    """ Check that the path is found iff A* finds one and is valid. """
+    reference = Astar(WIDTH, HEIGHT, cells=cells.copy(), mark_cells=False)
+    assert bool(path) == bool(reference.a_star_search(start_pos, end_pos))
+    if not path:
+        return
+    assert path[0] == start_pos and path[-1] == end_pos
+    assert len(set(path)) == len(path)
+    for (row1, col1), (row2, col2) in zip(path, path[1:]):
+        assert max(abs(row1 - row2), abs(col1 - col2)) == 1
+    assert all(cells[cell] != FULL for cell in path)
+
+
+def fresh_path(cells, start_pos, end_pos):
+    """ Return path of HPA* built for the cells from scratch. """
+    solver = HierarchicalAstar(WIDTH, HEIGHT, cells=cells.copy(),
+                               mark_cells=False, cluster_size=CLUSTER_SIZE)
+    return solver.a_star_search(start_pos, end_pos)
+
+
+def edit_cells(solver, rng, how):
+    """ Flip random cells of the solver grid in one of the ways. """
+    rows = rng.integers(HEIGHT, size=TOGGLES)
+    cols = rng.integers(WIDTH, size=TOGGLES)
+    if how == 'set_value':
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            solver.set_value(row, col, FULL if solver.cells[row, col] != FULL
+                             else EMPTY)
+    elif how == 'set_values':
+        solver.set_values(np.stack([rows, cols], axis=1),
+                          FULL if rng.random() < 0.5 else EMPTY)
+    else:   # direct writes, as Grid.version documents
+        solver.cells[rows, cols] = np.where(solver.cells[rows, cols] == FULL,
+                                            EMPTY, FULL)
+        solver.version += 1
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('how', ('set_value', 'set_values', 'direct'))
+def test_caches_follow_edits(seed, how):
+    rng = np.random.default_rng(seed)
+    solver = HierarchicalAstar(WIDTH, HEIGHT, cells=random_cells(rng),
+                               mark_cells=False, cluster_size=CLUSTER_SIZE)
+    for _ in range(ROUNDS):
+        for start_pos, end_pos in random_queries(rng, solver.cells):
+            path = solver.a_star_search(start_pos, end_pos)
+            check_path(solver.cells, path, start_pos, end_pos)
+            assert path == fresh_path(solver.cells, start_pos, end_pos)
+        edit_cells(solver, rng, how)
+
+
+def test_clear_from_full_drops_caches():
+    rng = np.random.default_rng(SEEDS[0])
+    solver = HierarchicalAstar(WIDTH, HEIGHT, cells=random_cells(rng),
+                               mark_cells=False, cluster_size=CLUSTER_SIZE)
+    queries = random_queries(rng, solver.cells)
+    for start_pos, end_pos in queries:
+        solver.a_star_search(start_pos, end_pos)
+    solver.clear_from(FULL)
+    for start_pos, end_pos in queries:
+        path = solver.a_star_search(start_pos, end_pos)
+        check_path(solver.cells, path, start_pos, end_pos)
+        assert path == fresh_path(solver.cells, start_pos, end_pos)
+
+
+def test_refined_path_has_no_loops():
+    solver = HierarchicalAstar(WIDTH, HEIGHT, mark_cells=False,
+                               cluster_size=CLUSTER_SIZE)
+    nodes = [solver.to_index(cell) for cell in ((0, 0), (0, 3), (0, 1),
+                                                (0, 5))]
+    cells = [solver.to_cell(idx) for idx in solver.refine(nodes)]
+    assert cells == [(0, col) for col in range(6)]
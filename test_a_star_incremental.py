@@ -0,0 +1,106 @@
+""" Tests of incremental replanning in 'a_star_incremental.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import numpy as np
+import pytest
+
+from a_star_benchmark import path_cost
+from a_star_engine import Astar, EMPTY, FULL
+from a_star_incremental import IncrementalAstar
+
+
+WIDTH = 30
+HEIGHT = 20
+SEEDS = (1, 2, 3)
+ROUNDS = 20
+TOGGLES = 8
+
+
+def random_cells(rng, density=0.25):
+    """ Return random cells with the corners free. """
+    cells = np.where(rng.random((HEIGHT, WIDTH)) < density,
+                     FULL, EMPTY).astype(np.uint8)
+    cells[0, 0] = cells[-1, -1] = EMPTY
+    return cells
+
+
+def fresh_cost(cells, start_pos, end_pos):
+    """ Return cost of the path found by A* from scratch or None. """
+    solver = Astar(WIDTH, HEIGHT, cells=cells.copy(), mark_cells=False,
+                   diagonal_cost=math.sqrt(2))
+    path = solver.a_star_search(start_pos, end_pos)
+    return path_cost(path) if path else None
+
+
+def check_path(solver, path, start_pos, end_pos):
+    """ Check that the path is a valid one with the cost of A*'s. """
+    expected = fresh_cost(solver.cells, start_pos, end_pos)
+    if expected is None:
+        assert path == []
+        return
+    assert path[0] == start_pos and path[-1] == end_pos
+    for (row1, col1), (row2, col2) in zip(path, path[1:]):
+        assert max(abs(row1 - row2), abs(col1 - col2)) == 1
+    assert all(solver.cells[cell] != FULL for cell in path)
+    assert path_cost(path) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('mark_cells', (False, True))
+def test_replan_matches_fresh_search(seed, mark_cells):
+    rng = np.random.default_rng(seed)
+    start_pos, end_pos = (0, 0), (HEIGHT - 1, WIDTH - 1)
+    solver = IncrementalAstar(WIDTH, HEIGHT, cells=random_cells(rng),
+                              mark_cells=mark_cells)
+    check_path(solver, solver.a_star_search(start_pos, end_pos),
+               start_pos, end_pos)
+    for round_idx in range(ROUNDS):
+        cells = [(int(rng.integers(HEIGHT)), int(rng.integers(WIDTH)))
+                 for _ in range(TOGGLES)]
+        cells = [cell for cell in cells if cell not in (start_pos, end_pos)]
+        if round_idx % 2:
+            for row, col in cells:
+                solver.set_value(row, col, FULL
+                                 if solver.cells[row, col] != FULL
+                                 else EMPTY)
+        else:
+            solver.set_values(cells, FULL if round_idx % 4 else EMPTY)
+        check_path(solver, solver.a_star_search(start_pos, end_pos),
+                   start_pos, end_pos)
+
+
+def test_clear_from_full_replans():
+    solver = IncrementalAstar(WIDTH, HEIGHT, mark_cells=False)
+    solver.set_values([(row, 10) for row in range(HEIGHT - 1)], FULL)
+    start_pos, end_pos = (0, 5), (0, 15)
+    check_path(solver, solver.a_star_search(start_pos, end_pos),
+               start_pos, end_pos)
+    solver.clear_from(FULL)
+    path = solver.a_star_search(start_pos, end_pos)
+    check_path(solver, path, start_pos, end_pos)
+    assert len(path) == 11
+
+
+def test_direct_writes_restart_search():
+    solver = IncrementalAstar(WIDTH, HEIGHT, mark_cells=False)
+    start_pos, end_pos = (0, 5), (0, 15)
+    check_path(solver, solver.a_star_search(start_pos, end_pos),
+               start_pos, end_pos)
+    solver.cells[:, 10] = FULL
+    solver.version += 1
+    assert solver.a_star_search(start_pos, end_pos) == []
+    assert solver.replan() == []
+    solver.cells[HEIGHT - 1, 10] = EMPTY
+    solver.version += 1
+    check_path(solver, solver.replan(), start_pos, end_pos)
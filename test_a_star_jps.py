@@ -0,0 +1,112 @@
+""" Tests of Jump Point Search in 'a_star_jps.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import numpy as np
+import pytest
+
+from a_star_benchmark import path_cost
+from a_star_engine import Astar, EMPTY, FULL
+from a_star_jps import JumpPointSearch
+
+
+WIDTH = 40
+HEIGHT = 30
+SEEDS = (1, 2, 3)
+ROUNDS = 8
+TOGGLES = 20
+QUERIES = 10
+
+
+def random_cells(rng, density=0.25):
+    """ Return random cells of the grid size. """
+    return np.where(rng.random((HEIGHT, WIDTH)) < density,
+                    FULL, EMPTY).astype(np.uint8)
+
+
+def random_queries(rng, cells):
+    """ Return list of (start, end) pairs of free cells. """
+    free = np.argwhere(cells != FULL)
+    queries = []
+    for _ in range(QUERIES):
+        start, end = rng.choice(len(free), 2, replace=False)
+        queries.append((tuple(free[start].tolist()),
+                        tuple(free[end].tolist())))
+    return queries
+
+
+def check_searches(solver, rng):
+    """ Check free map and path costs of the solver against A*. """
+    reference = Astar(WIDTH, HEIGHT, cells=solver.cells.copy(),
+                      mark_cells=False, diagonal_cost=math.sqrt(2))
+    for start_pos, end_pos in random_queries(rng, reference.cells):
+        path = solver.a_star_search(start_pos, end_pos)
+        expected = reference.a_star_search(start_pos, end_pos)
+        assert bool(path) == bool(expected)
+        if path:
+            assert path[0] == start_pos and path[-1] == end_pos
+            assert path_cost(path) == pytest.approx(path_cost(expected))
+        if solver.mark_cells:
+            solver.clear_marks()
+    assert solver.free_version == solver.version
+    assert not solver.free[[0, -1], :].any()
+    assert not solver.free[:, [0, -1]].any()
+    assert np.array_equal(solver.free[1:-1, 1:-1],
+                          solver.cells != FULL)
+
+
+def edit_cells(solver, rng, how):
+    """ Flip random cells of the solver grid in one of the ways. """
+    rows = rng.integers(HEIGHT, size=TOGGLES)
+    cols = rng.integers(WIDTH, size=TOGGLES)
+    if how == 'set_value':
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            solver.set_value(row, col, FULL if solver.cells[row, col] != FULL
+                             else EMPTY)
+    elif how == 'set_values':
+        solver.set_values(np.stack([rows, cols], axis=1),
+                          FULL if rng.random() < 0.5 else EMPTY)
+    elif how == 'clear_from':
+        solver.set_values(np.stack([rows, cols], axis=1), FULL)
+        if rng.random() < 0.3:
+            solver.clear_from(FULL)
+    else:   # direct writes, as Grid.version documents
+        solver.cells[rows, cols] = np.where(solver.cells[rows, cols] == FULL,
+                                            EMPTY, FULL)
+        solver.version += 1
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('how', ('set_value', 'set_values', 'clear_from',
+                                 'direct'))
+@pytest.mark.parametrize('mark_cells', (False, True))
+def test_free_map_follows_edits(seed, how, mark_cells):
+    rng = np.random.default_rng(seed)
+    solver = JumpPointSearch(WIDTH, HEIGHT, cells=random_cells(rng),
+                             mark_cells=mark_cells)
+    for _ in range(ROUNDS):
+        check_searches(solver, rng)
+        edit_cells(solver, rng, how)
+    check_searches(solver, rng)
+
+
+def test_free_map_patched_not_rebuilt():
+    rng = np.random.default_rng(SEEDS[0])
+    solver = JumpPointSearch(WIDTH, HEIGHT, cells=random_cells(rng),
+                             mark_cells=False)
+    check_searches(solver, rng)
+    free = solver.free
+    edit_cells(solver, rng, 'set_value')
+    edit_cells(solver, rng, 'set_values')
+    check_searches(solver, rng)
+    assert solver.free is free
@@ -0,0 +1,108 @@
+""" Tests of the compiled search backend of 'a_star_engine.py'. """
+
+
+__author__ = "Andrey Ermishin"
+__copyright__ = "Copyright (c) 2020"
+__credits__ = []
+__license__ = "GNU GPLv3"
+__version__ = "1.0.0"
+__maintainer__ = "Andrey Ermishin"
+__email__ = "andrey.yermishin@gmail.com"
+__status__ = "Production"
+
+
+import math
+import sys
+import numpy as np
+import pytest
+
+import a_star_kernel
+from a_star_benchmark import path_cost
+from a_star_engine import Astar, FULL
+from a_star_heuristics import HEURISTICS
+
+
+WIDTH = 40
+HEIGHT = 30
+SEEDS = (1, 2, 3)
+WEIGHTS = (1, 1.5)
+DIAGONAL_COSTS = (1, math.sqrt(2), 1.5)
+QUERIES = 30
+
+
+def random_grid(seed, density=0.3):
+    """ Return seeded random cells and list of (start, end) queries. """
+    rng = np.random.default_rng(seed)
+    cells = np.where(rng.random((HEIGHT, WIDTH)) < density,
+                     FULL, 0).astype(np.uint8)
+    free = np.argwhere(cells != FULL)
+    queries = []
+    for _ in range(QUERIES):
+        start, end = rng.choice(len(free), 2, replace=False)
+        queries.append((tuple(free[start].tolist()),
+                        tuple(free[end].tolist())))
+    return cells, queries
+
+
+def make_solver(cells, backend, **options):
+    """ Return Astar over a copy of cells that does not mark them. """
+    return Astar(WIDTH, HEIGHT, cells=cells.copy(), mark_cells=False,
+                 backend=backend, **options)
+
+
+@pytest.fixture
+def no_numba(monkeypatch):
+    """ Make numba impossible to import and forget the compiled search. """
+    monkeypatch.setitem(sys.modules, 'numba', None)
+    monkeypatch.setattr(a_star_kernel, 'compiled_search', None)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('heuristic', sorted(HEURISTICS))
+@pytest.mark.parametrize('weight', WEIGHTS)
+@pytest.mark.parametrize('diagonal_cost', DIAGONAL_COSTS)
+def test_numba_matches_python(seed, heuristic, weight, diagonal_cost):
+    pytest.importorskip('numba')
+    cells, queries = random_grid(seed)
+    options = dict(heuristic=heuristic, weight=weight,
+                   diagonal_cost=diagonal_cost)
+    python = make_solver(cells, 'python', **options)
+    numba = make_solver(cells, 'numba', **options)
+    assert not python.use_kernel()
+    assert numba.use_kernel()
+    for start_pos, end_pos in queries:
+        expected = python.a_star_search(start_pos, end_pos)
+        path = numba.a_star_search(start_pos, end_pos)
+        assert numba.is_over == python.is_over == bool(expected)
+        assert bool(path) == bool(expected)
+        if path:
+            assert path[0] == start_pos and path[-1] == end_pos
+            assert (path_cost(path, diagonal_cost)
+                    == path_cost(expected, diagonal_cost))
+
+
+def test_numba_unknown_heuristic():
+    pytest.importorskip('numba')
+    cells, queries = random_grid(SEEDS[0])
+    solver = make_solver(cells, 'numba')
+    solver.heuristic = 'unknown'
+    with pytest.raises(ValueError):
+        solver.a_star_search(*queries[0])
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        a_star_kernel.make_kernel(Astar(2, 2), 'unknown')
+
+
+def test_fallback_without_numba(no_numba):
+    assert a_star_kernel.get_compiled_search() is None
+    assert a_star_kernel.compiled_search is False
+    cells, queries = random_grid(SEEDS[0])
+    fallback = make_solver(cells, 'numba')
+    python = make_solver(cells, 'python')
+    assert fallback.kernel is None
+    assert not fallback.use_kernel()
+    for start_pos, end_pos in queries:
+        assert (fallback.a_star_search(start_pos, end_pos)
+                == python.a_star_search(start_pos, end_pos))